@@ -0,0 +1,159 @@
+"""Sliding cards between spots over time, without pygame"""
+import constants as c
+from typing import Dict, Optional, Tuple
+
+Point = Tuple[float, float]
+
+
+class Slide:
+    """
+    One card sliding from where it was to its new spot
+
+    ===Attributes===
+    start:
+        tuple of the x and y the card slides from
+    end:
+        tuple of the x and y the card slides to
+    steps:
+        int number of fixed steps the slide takes
+    step:
+        int number of steps taken so far
+    """
+    start: Point
+    end: Point
+    steps: int
+    step: int
+
+    def __init__(self, start: Point, end: Point, steps: int) -> None:
+        """ Initialize a slide that has not started moving """
+        self.start = start
+        self.end = end
+        self.steps = steps
+        self.step = 0
+
+    def at(self, step: int) -> Point:
+        """ Get where the card is after step steps, slowing down at the end """
+        done = min(step, self.steps) / self.steps
+        done = 1 - (1 - done) ** 3
+        return (self.start[0] + (self.end[0] - self.start[0]) * done,
+                self.start[1] + (self.end[1] - self.start[1]) * done)
+
+
+class Animator:
+    """
+    Moves the sliding cards in fixed steps of time, however fast frames are
+    drawn, and gets where to draw them between the last two steps
+
+    A slow frame runs several steps at once, skipping the frames that
+    would have been drawn between them, up to max_steps a frame, after
+    which the slides fall behind rather than the game
+
+    ===Attributes===
+    step_seconds:
+        float seconds of each fixed step
+    max_steps:
+        int most steps run for one frame
+    slides:
+        dict of the str key of each sliding card pointing to its Slide
+    previous:
+        dict of each sliding card pointing to where it was a step ago
+    current:
+        dict of each sliding card pointing to where it is at the last step
+    accumulator:
+        float seconds passed that have not been stepped yet
+    last:
+        float time advance was last called, or None if nothing was sliding
+    """
+    step_seconds: float
+    max_steps: int
+    slides: Dict[str, Slide]
+    previous: Dict[str, Point]
+    current: Dict[str, Point]
+    accumulator: float
+    last: Optional[float]
+
+    def __init__(self, step_seconds: float = c.SLIDE_STEP,
+                 max_steps: int = c.SLIDE_MAX_STEPS) -> None:
+        """ Initialize an animator with nothing sliding """
+        self.step_seconds = step_seconds
+        self.max_steps = max_steps
+        self.slides = {}
+        self.previous = {}
+        self.current = {}
+        self.accumulator = 0.0
+        self.last = None
+
+    def busy(self) -> bool:
+        """ Check if any card is sliding """
+        return len(self.slides) != 0
+
+    def slide(self, key: str, start: Point, end: Point,
+              steps: int = c.SLIDE_STEPS) -> None:
+        """ Start sliding the card from start to end """
+        if not self.busy():
+            # Time spent with nothing sliding does not count
+            self.last = None
+            self.accumulator = 0.0
+        self.slides[key] = Slide(start, end, steps)
+        self.previous[key] = start
+        self.current[key] = start
+
+    def end_of(self, key: str) -> Optional[Point]:
+        """ Get where the card is sliding to, or None if it is not """
+        if key not in self.slides:
+            return None
+        return self.slides[key].end
+
+    def advance(self, now: float) -> int:
+        """
+        Run the fixed steps that fit in the time since the last call
+        Returns the number of steps run
+        """
+        if self.last is None:
+            self.last = now
+        self.accumulator += now - self.last
+        self.last = now
+        steps = int(self.accumulator / self.step_seconds)
+        if steps > self.max_steps:
+            # Too far behind to catch up, let the slides run slower
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step_seconds
+
+        for _ in range(steps):
+            for key, slide in self.slides.items():
+                slide.step += 1
+                self.previous[key] = self.current[key]
+                self.current[key] = slide.at(slide.step)
+        return steps
+
+    def positions(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Get where to draw each sliding card, part way between its last two
+        steps by the time left over, and stop the slides that are done
+        """
+        alpha = self.accumulator / self.step_seconds
+        places = {}
+        for key in list(self.slides):
+            (old_x, old_y), (x, y) = self.previous[key], self.current[key]
+            places[key] = (round(old_x + (x - old_x) * alpha),
+                           round(old_y + (y - old_y) * alpha))
+            if self.slides[key].step > self.slides[key].steps:
+                # Drawn at its end once already, nothing left to move
+                self.stop(key)
+        return places
+
+    def finish(self) -> Dict[str, Tuple[int, int]]:
+        """ Stop every slide, getting the spot each card was sliding to """
+        places = {key: (round(slide.end[0]), round(slide.end[1]))
+                  for key, slide in self.slides.items()}
+        for key in places:
+            self.stop(key)
+        return places
+
+    def stop(self, key: str) -> None:
+        """ Forget the slide of the card """
+        del self.slides[key]
+        del self.previous[key]
+        del self.current[key]
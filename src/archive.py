@@ -0,0 +1,239 @@
+"""Saving games in progress, alone or many to an archive, without pygame"""
+import mmap
+import os
+import struct
+import engine
+from typing import BinaryIO, Dict, Optional, Tuple
+
+# Start of every save and archive, followed by the version
+MAGIC = b"SOLA"
+VERSION = 1
+HEADER = MAGIC + bytes([VERSION])
+# A record is the key of the game, the deal number, the length of each
+# pile, the cards of the piles in order padded to 52 and the visible and
+# locked bitmasks
+RECORD = struct.Struct("<QQ{}s52s7s7s".format(len(engine.PILES)))
+RECORD_SIZE = RECORD.size
+# Start of a record, the key of the game
+KEY = struct.Struct("<Q")
+# An index entry is the key of a game and the slot of its newest record
+ENTRY = struct.Struct("<QI")
+# Byte padding the cards of a record when fewer than 52 are placed
+PADDING = engine.NO_PILE
+
+
+def pack_record(key: int, deal_number: int,
+                state: engine.GameState) -> bytes:
+    """ Pack a game into RECORD_SIZE bytes, however many cards it has """
+    cards = b"".join(state.piles)
+    return RECORD.pack(key, deal_number,
+                       bytes(len(pile) for pile in state.piles),
+                       cards + bytes([PADDING]) * (52 - len(cards)),
+                       state.visible.to_bytes(7, "little"),
+                       state.locked.to_bytes(7, "little"))
+
+
+def unpack_record(data: bytes,
+                  offset: int = 0) -> Tuple[int, engine.GameState]:
+    """ Get the deal number and state of the record at offset in data """
+    _, deal_number, sizes, cards, visible, locked = RECORD.unpack_from(
+        data, offset)
+    state = engine.GameState()
+    on_card = 0
+    for pile, size in enumerate(sizes):
+        for card in cards[on_card:on_card + size]:
+            state.push(pile, card)
+        on_card += size
+    state.visible = int.from_bytes(visible, "little")
+    state.locked = int.from_bytes(locked, "little")
+    # The cards were placed before their flags were known
+    state.recount()
+    return deal_number, state
+
+
+def save(path: str, deal_number: int, state: engine.GameState) -> None:
+    """ Save one game in progress to a file at path """
+    with open(path, "wb") as file:
+        file.write(HEADER + pack_record(0, deal_number, state))
+
+
+def load(path: str) -> Tuple[int, engine.GameState]:
+    """ Load the deal number and state of a game saved with save """
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:len(HEADER)] != HEADER or \
+            len(data) != len(HEADER) + RECORD_SIZE:
+        raise ValueError("Not a saved game")
+    return unpack_record(data, len(HEADER))
+
+
+class ArchiveWriter:
+    """
+    Adds games to an archive, a file of fixed size records after a header
+    along with an index file of the key and slot of each game sorted by key
+    Saving a key again adds a new record and points the index at it, and
+    the index is made again from the records when the archive is opened
+
+    ===Attributes===
+    path:
+        str path of the records, the index is at path + ".idx"
+    file:
+        file the records are added to
+    slots:
+        dict of the key of each game pointing to the slot of its record
+    count:
+        int number of records in the file
+    """
+    path: str
+    file: BinaryIO
+    slots: Dict[int, int]
+    count: int
+
+    def __init__(self, path: str) -> None:
+        """ Open the archive at path, making it if there is none """
+        self.path = path
+        self.slots = {}
+        if os.path.exists(path):
+            self.file = open(path, "r+b")
+            if self.file.read(len(HEADER)) != HEADER:
+                self.file.close()
+                raise ValueError("Not an archive of games")
+            # Drop any record cut off part way through being written
+            size = os.path.getsize(path) - len(HEADER)
+            self.count = size // RECORD_SIZE
+            self.file.truncate(len(HEADER) + self.count * RECORD_SIZE)
+            # The newest record of each key is the one in the index
+            for slot in range(self.count):
+                self.slots[KEY.unpack(self.file.read(RECORD_SIZE)[
+                    :KEY.size])[0]] = slot
+        else:
+            self.file = open(path, "wb")
+            self.file.write(HEADER)
+            self.count = 0
+
+    def add(self, key: int, deal_number: int,
+            state: engine.GameState) -> None:
+        """ Add the game stored under key """
+        self.file.write(pack_record(key, deal_number, state))
+        self.slots[key] = self.count
+        self.count += 1
+
+    def close(self) -> None:
+        """ Write the index and close the archive """
+        self.file.close()
+        with open(self.path + ".idx", "wb") as index:
+            index.write(HEADER)
+            index.write(b"".join(ENTRY.pack(key, self.slots[key])
+                                 for key in sorted(self.slots)))
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class ArchiveReader:
+    """
+    Reads games from an archive by key, mapping both files into memory so
+    a lookup only touches the index entries of a binary search and one
+    record, however many games the archive holds
+
+    ===Attributes===
+    records:
+        mmap.mmap of the record file
+    index:
+        mmap.mmap of the index file
+    """
+    records: mmap.mmap
+    index: mmap.mmap
+
+    def __init__(self, path: str) -> None:
+        """ Open the archive at path for reading """
+        self.records = map_file(path)
+        self.index = map_file(path + ".idx")
+
+    def __len__(self) -> int:
+        """ Get the number of games in the index """
+        return (len(self.index) - len(HEADER)) // ENTRY.size
+
+    def entry(self, slot: int) -> Tuple[int, int]:
+        """ Get the key and record slot of an index entry """
+        return ENTRY.unpack_from(self.index, len(HEADER) + slot * ENTRY.size)
+
+    def record(self, slot: int) -> Tuple[int, engine.GameState]:
+        """ Get the deal number and state of the record in slot """
+        return unpack_record(self.records, len(HEADER) + slot * RECORD_SIZE)
+
+    def find(self, key: int) -> Optional[int]:
+        """ Get the record slot of the game stored under key, or None """
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            found, slot = self.entry(middle)
+            if found == key:
+                return slot
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, key: int) -> Optional[Tuple[int, engine.GameState]]:
+        """ Get the deal number and state stored under key, or None """
+        slot = self.find(key)
+        if slot is None:
+            return None
+        return self.record(slot)
+
+    def close(self) -> None:
+        """ Unmap the archive """
+        self.records.close()
+        self.index.close()
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def map_file(path: str) -> mmap.mmap:
+    """ Map a file of the archive into memory to read, checking its header """
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(HEADER)] != HEADER:
+        mapped.close()
+        raise ValueError("Not an archive of games")
+    return mapped
+
+
+if __name__ == "__main__":
+    # python archive.py path count
+    # Archive count dealt games part way through and time looking them up
+    import random
+    import sys
+    import time
+    import deals
+
+    total = int(sys.argv[2])
+    rng = random.Random(0)
+    begin = time.perf_counter()
+    with ArchiveWriter(sys.argv[1]) as writer:
+        game = engine.GameState()
+        packed = deals.bulk_deals(0, total)
+        for number in range(total):
+            game.deal(packed[number * 52:number * 52 + 52])
+            for _ in range(rng.randrange(20)):
+                game.apply(rng.choice(game.legal_moves()))
+            writer.add(number, number, game)
+    written = time.perf_counter() - begin
+
+    with ArchiveReader(sys.argv[1]) as reader:
+        keys = [rng.randrange(total) for _ in range(10000)]
+        begin = time.perf_counter()
+        for wanted in keys:
+            reader.get(wanted)
+        looked = (time.perf_counter() - begin) / len(keys)
+    print("{} games, {} bytes each, written in {:.1f} s, {:.1f} us per "
+          "lookup".format(total, RECORD_SIZE, written, looked * 1e6))
@@ -0,0 +1,105 @@
+"""Solve ranges of numbered deals on every core, writing each result"""
+import multiprocessing
+import os
+import sys
+import deals
+import engine
+import solver
+from typing import List, Optional, Set, Tuple
+
+# Text written for each answer the solver can give
+ANSWERS = {True: "yes", False: "no", None: "unknown"}
+
+
+def solve_range(task: Tuple[int, int, int]) -> List[str]:
+    """
+    Solve the deals from start up to stop and get a line for each
+    Only the three ints are sent to the worker, the engine tables were
+    built when the module was imported
+    """
+    start, stop, max_nodes = task
+    lines = []
+    state = engine.GameState()
+    packed = deals.bulk_deals(start, stop - start)
+    for number in range(start, stop):
+        offset = (number - start) * 52
+        state.deal(packed[offset:offset + 52])
+        result = solver.solve(state, max_nodes)
+        lines.append("{},{},{}\n".format(
+            number, ANSWERS[result.winnable], result.nodes))
+    return lines
+
+
+def done_deals(path: str) -> Set[int]:
+    """
+    Get the deal numbers already written to the file at path
+    A line cut off by an interruption is removed from the file
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as file:
+        data = file.read()
+        # Everything after the last full line is thrown away
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            file.truncate(end)
+    return {int(line.split(b",", 1)[0]) for line in data[:end].splitlines()}
+
+
+def missing_ranges(start: int, stop: int, done: Set[int],
+                   chunk: int) -> List[Tuple[int, int]]:
+    """ Split the deals from start up to stop not in done into ranges """
+    ranges = []
+    number = start
+    while number < stop:
+        if number in done:
+            number += 1
+            continue
+        # Grow the range until it is full or reaches a solved deal
+        end = number + 1
+        while end < min(stop, number + chunk) and end not in done:
+            end += 1
+        ranges.append((number, end))
+        number = end
+    return ranges
+
+
+def run_batch(path: str, start: int, stop: int,
+              processes: Optional[int] = None, chunk: int = 50,
+              max_nodes: int = 50000) -> int:
+    """
+    Solve the deals from start up to stop across a pool of processes,
+    adding a line of deal number, answer and nodes to the file at path as
+    each range finishes
+    The file is also the checkpoint, running again with the same file only
+    solves the deals missing from it
+    Returns the number of deals solved by this run
+    """
+    ranges = missing_ranges(start, stop, done_deals(path), chunk)
+    tasks = [(begin, end, max_nodes) for begin, end in ranges]
+    # Forked workers share the parent's tables instead of rebuilding them
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context(
+        "fork" if "fork" in methods else None)
+
+    solved = 0
+    with open(path, "a") as file, context.Pool(processes) as pool:
+        for lines in pool.imap_unordered(solve_range, tasks):
+            # Each range is written whole so it is never half checkpointed
+            file.write("".join(lines))
+            file.flush()
+            os.fsync(file.fileno())
+            solved += len(lines)
+    return solved
+
+
+if __name__ == "__main__":
+    # python batch.py output start stop [processes]
+    import time
+
+    begin = time.perf_counter()
+    count = run_batch(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]),
+                      int(sys.argv[4]) if len(sys.argv) > 4 else None)
+    seconds = time.perf_counter() - begin
+    print("{} deals in {:.1f} s, {:.1f} deals/s".format(
+        count, seconds, count / max(seconds, 1e-9)))
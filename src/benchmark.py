@@ -0,0 +1,121 @@
+"""Headless timings of the hot paths of the game, written as json"""
+import os
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import pygame
+import engine
+import game
+from typing import Callable, Dict, Optional
+
+# Deal every benchmark plays, so runs can be compared
+DEAL_NUMBER = 1
+
+
+def timed(func: Callable[[], object], count: int, rounds: int,
+          setup: Optional[Callable[[], object]] = None) -> Dict[str, float]:
+    """
+    Time rounds of calling func count times, running setup untimed before
+    each round, and get the microseconds per call
+    """
+    times = []
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(count):
+            func()
+        times.append((time.perf_counter() - start) / count * 1e6)
+    return {"calls": count * rounds,
+            "min_us": min(times),
+            "median_us": statistics.median(times),
+            "mean_us": statistics.mean(times)}
+
+
+def draw_deck(g: game.Game) -> None:
+    """ Draw the top card of the deck into the hand """
+    g.move_to_hand(g.valid_pos["DECK"][2][-1])
+
+
+def stock_cycle(g: game.Game) -> None:
+    """ Draw the rest of the deck into the hand and put it all back """
+    while len(g.state.piles[engine.DECK]) != 0:
+        draw_deck(g)
+    g.reset_deck()
+
+
+def draw_full(g: game.Game) -> None:
+    """ Draw the whole screen """
+    g.dirty.invalidate()
+    g.draw()
+
+
+def drag_and_drop(g: game.Game) -> None:
+    """
+    Drag the top card of the last table across the screen and drop it
+    back on its own pile, drawing every frame like run does, so no move
+    is made and every round starts from the same game
+    """
+    key = g.valid_pos["TABLE6"][2][-1]
+    x, y = g.cards[key].get_x() + 5, g.cards[key].get_y() + 5
+    g.handle_event(pygame.event.Event(
+        pygame.MOUSEBUTTONDOWN, button=1, pos=(x, y)))
+    g.draw()
+    for step in range(1, 21):
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEMOTION, buttons=(1, 0, 0),
+            pos=(x - step * 15, y - step * 5)))
+        g.draw()
+    g.handle_event(pygame.event.Event(
+        pygame.MOUSEBUTTONUP, button=1, pos=(x, y)))
+    g.draw()
+
+
+def run_all(rounds: int = 20) -> Dict[str, object]:
+    """ Run every benchmark on a new game and get the results """
+    # Run without a window unless a video driver was picked
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    g = game.Game(DEAL_NUMBER)
+    g.draw()
+    stock = len(g.state.piles[engine.DECK])
+    rng = random.Random(0)
+    points = [(rng.randrange(g.screen.get_width()),
+               rng.randrange(g.screen.get_height())) for _ in range(1000)]
+    place = iter(points * (rounds + 1))
+
+    results = {
+        "get_pressed": timed(lambda: g.get_pressed(*next(place)),
+                             len(points) // rounds, rounds),
+        "check_pile": timed(lambda: g.check_pile(*next(place)),
+                            len(points) // rounds, rounds),
+        "save_state": timed(g.save_state, 100, rounds),
+        "move_to_hand_undo": timed(lambda: (draw_deck(g), g.undo()),
+                                   100, rounds, lambda: stock_cycle(g)),
+        "move_to_hand": timed(lambda: draw_deck(g), stock, rounds,
+                              lambda: stock_cycle(g)),
+        "stock_cycle": timed(lambda: stock_cycle(g), 5, rounds),
+        "draw_full": timed(lambda: draw_full(g), 5, rounds),
+        "drag_and_drop": timed(lambda: drag_and_drop(g), 1, rounds),
+    }
+    return {"python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "video_driver": os.environ["SDL_VIDEODRIVER"],
+            "deal_number": DEAL_NUMBER,
+            "rounds": rounds,
+            "results": results}
+
+
+if __name__ == "__main__":
+    # python benchmark.py [output.json]
+    # Game loads its sprites from next to this file
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    text = json.dumps(run_all(), indent=2)
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "w") as file:
+            file.write(text)
+    else:
+        print(text)
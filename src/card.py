@@ -1,4 +1,5 @@
 import pygame
+import sprites
 import constants as c
 
 
@@ -23,6 +24,8 @@ class Card:
         int x position of face sprite on the sprite sheet
     face_y:
         int y position of face sprite on the sprite sheet
+    number:
+        int index of the face sprite in sprites.CardSprites.faces
     """
     suit: str
     rank: str
@@ -32,6 +35,7 @@ class Card:
     locked: bool
     img_x: int
     img_y: int
+    number: int
 
     def __init__(self, i: int, j: int) -> None:
         """
@@ -54,6 +58,7 @@ class Card:
         self.locked = False
         self.face_x = j * c.CARD_WIDTH
         self.face_y = i * c.CARD_HEIGHT
+        self.number = i * 13 + j
 
     def get_suit(self) -> str:
         """Returns the suit of the card"""
@@ -128,16 +133,13 @@ class Card:
         """Sets self.lock to state"""
         self.locked = state
 
-    def draw(self, img: pygame.Surface, screen: pygame.Surface) -> None:
-        """Draws this cards sprite from img to screen"""
+    def draw(self, images: sprites.CardSprites,
+             screen: pygame.Surface) -> None:
+        """Draws this cards sprite from images to screen"""
         if self.visible:
-            screen.blit(img, (self.x, self.y),
-                        pygame.Rect(self.face_x, self.face_y,
-                        c.CARD_WIDTH, c.CARD_HEIGHT))
+            screen.blit(images.faces[self.number], (self.x, self.y))
         else:
-            screen.blit(img, (self.x, self.y),
-                        pygame.Rect(c.CARD_BACK_X, c.CARD_BACK_Y,
-                        c.CARD_WIDTH, c.CARD_HEIGHT))
+            screen.blit(images.back, (self.x, self.y))
 
     def picked(self, mouse_x: int, mouse_y: int) -> bool:
         """Checks if this card is being clicked"""
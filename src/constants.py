@@ -11,3 +11,69 @@ CARD_BACK_X = 546
 CARD_BACK_Y = 60
 
 BACK_COLOUR = (7, 99, 36)
+
+# Most moves that can be undone
+UNDO_LIMIT = 10
+
+# Number of frames the profiler keeps the times of
+PROFILE_WINDOW = 300
+# Frames slower than this many seconds are kept as hitches
+HITCH_SECONDS = 1 / 60
+# Spot of the frame times drawn over the game, as x, y, width, height
+PROFILE_RECT = (5, SCREEN_HEIGHT - 45, 400, 40)
+# File the profiler is written to when F12 is pressed
+PROFILE_FILE = "profile.json"
+
+# Most seconds a hint is searched for
+HINT_SECONDS = 2.0
+# Colour of the outlines showing a hint
+HINT_COLOUR = (255, 215, 0)
+
+# Seconds of each fixed step of the card slides
+SLIDE_STEP = 1 / 120
+# Steps a card takes to slide to its new spot
+SLIDE_STEPS = 24
+# Most steps run for one frame, past this the slides slow down
+SLIDE_MAX_STEPS = 12
+
+# File the game in progress is saved to with F5 and loaded from with F9
+SAVE_FILE = "solitaire.sav"
+
+# Top left corner of each pile, cards on the tables spread down from it
+PILE_SPOTS = {
+    # Position for cards in the deck
+    "DECK": (SCREEN_WIDTH - CARD_WIDTH * 2, 30),
+    # Position for cards in the 3 hand slots
+    "HAND2": (SCREEN_WIDTH - CARD_WIDTH * 2 - 30 - CARD_WIDTH,
+              30),  # x pos for card in the hand
+    "HAND1": (SCREEN_WIDTH - CARD_WIDTH * 2 - 30 -
+              CARD_WIDTH - CARD_WIDTH // 2, 30),
+    "HAND0": (SCREEN_WIDTH - CARD_WIDTH * 2 - 30 -
+              CARD_WIDTH - CARD_WIDTH, 30),
+    # Position for final stacks starting with ace
+    "ACE0": (30, 30),  # x pos for where aces may start piles
+    "ACE1": (60 + CARD_WIDTH, 30),
+    "ACE2": (90 + 2 * CARD_WIDTH, 30),
+    "ACE3": (120 + 3 * CARD_WIDTH, 30),
+    # Position for cards on the table
+    "TABLE0": ((SCREEN_WIDTH - (7 * CARD_WIDTH + 6 * 30)) // 2,
+               60 + CARD_HEIGHT),
+    "TABLE1": ((SCREEN_WIDTH - (7 * CARD_WIDTH + 6 * 30)) // 2 +
+               30 + CARD_WIDTH,
+               60 + CARD_HEIGHT),
+    "TABLE2": ((SCREEN_WIDTH - (7 * CARD_WIDTH + 6 * 30)) // 2 +
+               60 + 2 * CARD_WIDTH,
+               60 + CARD_HEIGHT),
+    "TABLE3": ((SCREEN_WIDTH - (7 * CARD_WIDTH + 6 * 30)) // 2 +
+               90 + 3 * CARD_WIDTH,
+               60 + CARD_HEIGHT),
+    "TABLE4": ((SCREEN_WIDTH - (7 * CARD_WIDTH + 6 * 30)) // 2 +
+               120 + 4 * CARD_WIDTH,
+               60 + CARD_HEIGHT),
+    "TABLE5": ((SCREEN_WIDTH - (7 * CARD_WIDTH + 6 * 30)) // 2 +
+               150 + 5 * CARD_WIDTH,
+               60 + CARD_HEIGHT),
+    "TABLE6": ((SCREEN_WIDTH - (7 * CARD_WIDTH + 6 * 30)) // 2 +
+               180 + 6 * CARD_WIDTH,
+               60 + CARD_HEIGHT)
+}
@@ -0,0 +1,92 @@
+"""Numbered deals, so deal N is the same layout on every machine"""
+import random
+from typing import List
+
+try:
+    import numpy as np
+except ImportError:
+    # Deals are made one at a time without numpy, with the same results
+    np = None
+
+# Deal numbers are picked from 0 up to this for a random game
+DEAL_COUNT = 1 << 32
+# Mask keeping the low 64 bits of an int
+MASK = (1 << 64) - 1
+
+
+def mix(value: int) -> int:
+    """ Scramble the 64 bit value into a random looking 64 bit value """
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ value >> 30) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ value >> 27) * 0x94D049BB133111EB) & MASK
+    return value ^ value >> 31
+
+
+def random_deal_number() -> int:
+    """ Pick the number of a deal for a new game """
+    return random.randrange(DEAL_COUNT)
+
+
+def deal_order(number: int) -> List[int]:
+    """
+    Get the card numbers dealt for deal number, in the order
+    engine.GameState.deal places them
+    Each swap of the shuffle is picked by mixing the deal number with the
+    place being swapped, so any deal can be made without the ones before it
+    """
+    order = list(range(52))
+    for place in range(51, 0, -1):
+        swap = mix(number << 6 | place) % (place + 1)
+        order[place], order[swap] = order[swap], order[place]
+    return order
+
+
+def bulk_deals(start: int, count: int) -> bytearray:
+    """
+    Get deals start up to start + count packed into 52 bytes each, the
+    cards of deal start + i at [i * 52:(i + 1) * 52]
+    With numpy every deal is shuffled at once, one place at a time
+    """
+    if np is None:
+        packed = bytearray()
+        for number in range(start, start + count):
+            packed += bytes(deal_order(number))
+        return packed
+
+    rows = np.arange(count)
+    numbers = np.arange(start, start + count, dtype=np.uint64) << \
+        np.uint64(6)
+    orders = np.tile(np.arange(52, dtype=np.uint8), (count, 1))
+    with np.errstate(over="ignore"):
+        for place in range(51, 0, -1):
+            # The same steps as mix, wrapping at 64 bits for every deal
+            value = (numbers | np.uint64(place)) + \
+                np.uint64(0x9E3779B97F4A7C15)
+            value = (value ^ value >> np.uint64(30)) * \
+                np.uint64(0xBF58476D1CE4E5B9)
+            value = (value ^ value >> np.uint64(27)) * \
+                np.uint64(0x94D049BB133111EB)
+            value ^= value >> np.uint64(31)
+            swap = (value % np.uint64(place + 1)).astype(np.intp)
+            moving = orders[rows, swap]
+            orders[rows, swap] = orders[:, place]
+            orders[:, place] = moving
+    return bytearray(orders.tobytes())
+
+
+if __name__ == "__main__":
+    # Time making a batch of deals both ways
+    import sys
+    import time
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    begin = time.perf_counter()
+    bulk_deals(0, count)
+    seconds = time.perf_counter() - begin
+    print("{}: {:.0f} deals/min".format(
+        "numpy" if np is not None else "python", count / seconds * 60))
+    np = None
+    begin = time.perf_counter()
+    bulk_deals(0, count // 10)
+    seconds = time.perf_counter() - begin
+    print("python: {:.0f} deals/min".format(count // 10 / seconds * 60))
@@ -0,0 +1,684 @@
+"""Headless rules engine for the game, no pygame required"""
+import random
+import constants as c
+from collections.abc import MutableSequence
+from typing import List, Iterable, Optional, Tuple
+
+# Names of the piles, the index in this list is the pile number
+PILES = ["DECK", "HAND0", "HAND1", "HAND2",
+         "ACE0", "ACE1", "ACE2", "ACE3",
+         "TABLE0", "TABLE1", "TABLE2", "TABLE3", "TABLE4", "TABLE5", "TABLE6"]
+DECK = 0
+HAND0 = 1
+HAND1 = 2
+HAND2 = 3
+ACE0 = 4
+TABLE0 = 8
+HANDS = range(HAND0, HAND2 + 1)
+ACES = range(ACE0, ACE0 + 4)
+TABLES = range(TABLE0, TABLE0 + 7)
+# Pile number for each pile name
+PILE_NUMBERS = {name: index for index, name in enumerate(PILES)}
+
+# Pile number stored for a card that is in no pile
+NO_PILE = 255
+
+# Cards are numbered 0-51 as suit * 13 + rank, using the order in constants
+KEYS = [suit + rank for suit in c.SUITS for rank in c.RANKS]
+IDS = {key: card for card, key in enumerate(KEYS)}
+# Index in c.RANKS, index in c.SUITS and colour of each card number
+RANK = bytes(card % 13 for card in range(52))
+SUIT = bytes(card // 13 for card in range(52))
+COLOUR = bytes(card // 26 for card in range(52))
+
+# Number used for the top of an empty pile in the lookup tables
+EMPTY = 52
+# Lookup tables at card a * 53 + card b, holding 1 if a can be put on b
+# on the table or on a final pile, with b as EMPTY for an empty pile
+STACKS_ON = bytes(
+    RANK[a] == 12 if b == EMPTY else
+    RANK[a] + 1 == RANK[b] and COLOUR[a] != COLOUR[b]
+    for a in range(52) for b in range(53))
+FOUNDS_ON = bytes(
+    RANK[a] == 0 if b == EMPTY else
+    RANK[a] == RANK[b] + 1 and SUIT[a] == SUIT[b]
+    for a in range(52) for b in range(53))
+
+# Kinds of moves
+# A move is a tuple of (kind, from pile, to pile, number of cards)
+DRAW = 0
+RESET = 1
+PLACE = 2
+Move = Tuple[int, int, int, int]
+
+# Random 64 bit keys for hashing a state, made the same way every run
+# A card at an index of a pile uses ZOBRIST[(pile * 52 + index) * 52 + card]
+_random = random.Random(52)
+ZOBRIST = [_random.getrandbits(64) for _ in range(len(PILES) * 52 * 52)]
+
+
+def byte_keys(bits: List[int]) -> List[List[int]]:
+    """
+    Get the key of every value of each of the 7 bytes of a bitmask, equal
+    to the keys in bits of its set bits xor'ed together
+    """
+    keys = [[0] * 256 for _ in range(7)]
+    for byte in range(7):
+        for value in range(1, 256):
+            # Add the highest set bit to the value without it
+            bit = value.bit_length() - 1
+            card = byte * 8 + bit
+            keys[byte][value] = keys[byte][value ^ 1 << bit] ^ \
+                (bits[card] if card < 52 else 0)
+    return keys
+
+
+# Keys of the visible and locked bitmasks
+VISIBLE_KEYS = byte_keys([_random.getrandbits(64) for _ in range(52)])
+LOCKED_KEYS = byte_keys([_random.getrandbits(64) for _ in range(52)])
+
+
+def mask_hash(mask: int, keys: List[List[int]]) -> int:
+    """ Get the hash of a 52 card bitmask, a byte at a time """
+    return keys[0][mask & 255] ^ keys[1][mask >> 8 & 255] ^ \
+        keys[2][mask >> 16 & 255] ^ keys[3][mask >> 24 & 255] ^ \
+        keys[4][mask >> 32 & 255] ^ keys[5][mask >> 40 & 255] ^ \
+        keys[6][mask >> 48 & 255]
+
+
+class GameState:
+    """
+    Pure python state of a game, along with the rules to change it
+
+    Cards are stored as their number, so copying, comparing or packing a
+    state only touches a few bytes
+
+    ===Attributes===
+    piles:
+        list holding a bytearray of card numbers for every pile in PILES,
+        ordered from the bottom card to the top card
+    where:
+        bytearray of the pile number each card is in, NO_PILE if none
+    visible:
+        int bitmask of the cards whose face is showing
+    locked:
+        int bitmask of the cards that can not be moved
+    history:
+        bytearray log of the moves made, used to undo them
+        Each record holds the piles cards moved between and the old flags
+        of every card whose flags changed, with its size at both ends
+    undo_count:
+        int number of records in history
+    undo_limit:
+        int most records to keep in history, or None to keep them all
+    recording:
+        bytearray of the steps made by the move in progress, or None
+    old_visible:
+        int visible bitmask from when the move in progress started
+    old_locked:
+        int locked bitmask from when the move in progress started
+    placement:
+        int xor of the ZOBRIST keys of every card at its place, kept up to
+        date as cards move
+    founded:
+        int number of cards on the final piles, kept up to date as cards
+        move
+    hidden:
+        int number of face down cards on the table, kept up to date as
+        cards move and turn over
+    """
+    piles: List[bytearray]
+    where: bytearray
+    visible: int
+    locked: int
+    history: bytearray
+    undo_count: int
+    undo_limit: Optional[int]
+    recording: Optional[bytearray]
+    old_visible: int
+    old_locked: int
+    placement: int
+    founded: int
+    hidden: int
+
+    def __init__(self, undo_limit: Optional[int] = None) -> None:
+        """ Initialize an empty state with no cards placed """
+        self.piles = [bytearray() for _ in PILES]
+        self.where = bytearray([NO_PILE]) * 52
+        self.visible = 0
+        self.locked = 0
+        self.history = bytearray()
+        self.undo_count = 0
+        self.undo_limit = undo_limit
+        self.recording = None
+        self.old_visible = 0
+        self.old_locked = 0
+        self.placement = 0
+        self.founded = 0
+        self.hidden = 0
+
+    def deal(self, order: Iterable[int]) -> None:
+        """ Place the cards in order on the table and in the deck """
+        for pile in self.piles:
+            pile.clear()
+        self.placement = 0
+        self.founded = 0
+        self.hidden = 0
+        self.where = bytearray([NO_PILE]) * 52
+        self.visible = (1 << 52) - 1
+        self.locked = 0
+        self.history.clear()
+        self.undo_count = 0
+        order = bytes(order)
+        on_card = 0
+
+        # Place the cards on the 7 table slots
+        for a in range(7):
+            for i in range(a + 1):
+                self.push(TABLE0 + a, order[on_card])
+                if i != a:
+                    # Flip all but the last card and make them immovable
+                    self.take_out_play(order[on_card])
+                on_card += 1
+
+        # Place the remaining cards in the deck position
+        while on_card < len(order):
+            self.push(DECK, order[on_card])
+            self.take_out_play(order[on_card])
+            on_card += 1
+
+        # Allow the top deck card to be moved
+        if len(self.piles[DECK]) != 0:
+            self.locked &= ~(1 << self.piles[DECK][-1])
+
+    def copy(self) -> 'GameState':
+        """
+        Get a copy of this state that can change separately
+        The copy starts with no moves to undo
+        """
+        other = GameState(self.undo_limit)
+        other.piles = [pile[:] for pile in self.piles]
+        other.where = self.where[:]
+        other.visible = self.visible
+        other.locked = self.locked
+        other.placement = self.placement
+        other.founded = self.founded
+        other.hidden = self.hidden
+        return other
+
+    def pack(self) -> bytes:
+        """
+        Get the state as a short string of bytes, to hash, compare or store
+        Each pile is stored as its length followed by its cards
+        """
+        data = bytearray()
+        for pile in self.piles:
+            data.append(len(pile))
+            data += pile
+        return bytes(data) + self.visible.to_bytes(7, "little") + \
+            self.locked.to_bytes(7, "little")
+
+    @staticmethod
+    def unpack(data: bytes) -> 'GameState':
+        """ Recreate a state from the bytes made by pack """
+        state = GameState()
+        on_byte = 0
+        for index in range(len(PILES)):
+            size = data[on_byte]
+            for card in data[on_byte + 1:on_byte + 1 + size]:
+                state.push(index, card)
+            on_byte += 1 + size
+        state.visible = int.from_bytes(data[on_byte:on_byte + 7], "little")
+        state.locked = int.from_bytes(data[on_byte + 7:on_byte + 14], "little")
+        # The cards were placed before their flags were known
+        state.recount()
+        return state
+
+    def __eq__(self, other: object) -> bool:
+        """ Check if both states have the same cards in the same places """
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return self.piles == other.piles and \
+            self.visible == other.visible and self.locked == other.locked
+
+    def __hash__(self) -> int:
+        return self.zobrist()
+
+    def zobrist(self) -> int:
+        """
+        Get a 64 bit hash of the state, the same for equal states
+        The card places are hashed as they move, the flags are hashed from
+        a table for each byte of their bitmask
+        """
+        return self.placement ^ mask_hash(self.visible, VISIBLE_KEYS) ^ \
+            mask_hash(self.locked, LOCKED_KEYS)
+
+    def rehash(self) -> None:
+        """ Work out placement again from the piles, after changing them """
+        self.placement = 0
+        for pile, cards in enumerate(self.piles):
+            for index, card in enumerate(cards):
+                self.placement ^= ZOBRIST[(pile * 52 + index) * 52 + card]
+
+    def recount(self) -> None:
+        """ Work out founded and hidden again from the piles and flags """
+        self.founded = sum(len(self.piles[ace]) for ace in ACES)
+        self.hidden = sum(1 for table in TABLES for card in self.piles[table]
+                          if not self.visible >> card & 1)
+
+    def count(self, pile: int, card: int, step: int) -> None:
+        """ Add step to the counters the card counts towards in the pile """
+        if pile in ACES:
+            self.founded += step
+        elif pile in TABLES and not self.visible >> card & 1:
+            self.hidden += step
+
+    def is_visible(self, card: int) -> bool:
+        """ Check if the face of the card is showing """
+        return self.visible >> card & 1 == 1
+
+    def is_locked(self, card: int) -> bool:
+        """ Check if the card can not be moved """
+        return self.locked >> card & 1 == 1
+
+    # =====RULES===== #
+
+    def top(self, pile: int) -> int:
+        """ Get the top card of the pile, or EMPTY if there is none """
+        if len(self.piles[pile]) == 0:
+            return EMPTY
+        return self.piles[pile][-1]
+
+    def will_table_take(self, card: int, table: int) -> bool:
+        """
+        Check if the card fits the pattern of the table, one rank lower and
+        the opposite colour, or a king on an empty table
+        """
+        return STACKS_ON[card * 53 + self.top(table)] == 1
+
+    def will_ace_take(self, card: int, ace: int) -> bool:
+        """
+        Check if the card fits the final piles pattern, one rank higher and
+        the same suit, or an ace on an empty pile
+        """
+        return FOUNDS_ON[card * 53 + self.top(ace)] == 1
+
+    def will_take(self, card: int, count: int, pile: int) -> bool:
+        """ Check if count cards starting at card can be put on pile """
+        if pile in TABLES:
+            return self.will_table_take(card, pile)
+        if pile in ACES:
+            # Only one card can be put at a time
+            return count == 1 and self.will_ace_take(card, pile)
+        return False
+
+    def is_won(self) -> bool:
+        """ Check if all 4 final piles are full """
+        return self.founded == 52
+
+    def can_finish(self) -> bool:
+        """
+        Check if every card not on the final piles is face up on the table,
+        so moving them to the final piles in order always wins
+        """
+        return self.hidden == 0 and len(self.piles[DECK]) == 0 and \
+            len(self.piles[HAND0]) + len(self.piles[HAND1]) + \
+            len(self.piles[HAND2]) == 0
+
+    def legal_moves(self) -> List[Move]:
+        """ List every move that can be made from this state """
+        return legal_moves(self)
+
+    # =====MOVES===== #
+
+    def apply(self, move: Move) -> None:
+        """ Make the move, without checking if it is legal """
+        kind, src, dst, count = move
+        if kind == DRAW:
+            self.move_to_hand(self.piles[DECK][-1])
+        elif kind == RESET:
+            self.reset_deck()
+        else:
+            self.move_stack(src, dst, count)
+
+    def find(self, card: int) -> int:
+        """ Get the number of the pile holding the card """
+        return self.where[card]
+
+    def push(self, pile: int, card: int) -> None:
+        """ Put the card on top of the pile """
+        self.placement ^= ZOBRIST[(pile * 52 + len(self.piles[pile])) * 52 +
+                                  card]
+        self.piles[pile].append(card)
+        self.where[card] = pile
+        self.count(pile, card, 1)
+
+    def pop(self, pile: int) -> int:
+        """ Take the top card off of the pile """
+        card = self.piles[pile].pop()
+        self.where[card] = NO_PILE
+        self.count(pile, card, -1)
+        self.placement ^= ZOBRIST[(pile * 52 + len(self.piles[pile])) * 52 +
+                                  card]
+        return card
+
+    def put(self, pile: int, index: int, card: int) -> None:
+        """ Put the card into the pile before index """
+        # Find where the card lands, the same way list.insert does
+        if index < 0:
+            index = max(0, index + len(self.piles[pile]))
+        index = min(index, len(self.piles[pile]))
+        # The cards above index move up a place
+        self.hash_places(pile, index)
+        self.piles[pile].insert(index, card)
+        self.where[card] = pile
+        self.count(pile, card, 1)
+        self.hash_places(pile, index)
+
+    def take(self, pile: int, index: int) -> int:
+        """ Take the card at index out of the pile """
+        if index < 0:
+            index += len(self.piles[pile])
+        # The cards above index move down a place
+        self.hash_places(pile, index)
+        card = self.piles[pile].pop(index)
+        self.where[card] = NO_PILE
+        self.count(pile, card, -1)
+        self.hash_places(pile, index)
+        return card
+
+    def hash_places(self, pile: int, index: int) -> None:
+        """ Xor the keys of the cards in the pile from index up """
+        for place in range(index, len(self.piles[pile])):
+            self.placement ^= ZOBRIST[(pile * 52 + place) * 52 +
+                                      self.piles[pile][place]]
+
+    def shift(self, src: int, dst: int, count: int) -> None:
+        """ Move the top count cards of src onto dst, keeping their order """
+        self.move_cards(src, dst, count)
+        if self.recording is not None:
+            self.recording.append(src << 4 | dst)
+            self.recording.append(count)
+
+    def move_cards(self, src: int, dst: int, count: int) -> None:
+        """ Move the top count cards of src onto dst, without recording """
+        start = len(self.piles[src]) - count
+        end = len(self.piles[dst])
+        moving = self.piles[src][start:]
+        del self.piles[src][start:]
+        self.piles[dst].extend(moving)
+        for index, card in enumerate(moving):
+            self.where[card] = dst
+            self.placement ^= ZOBRIST[(src * 52 + start + index) * 52 +
+                                      card] ^ \
+                ZOBRIST[(dst * 52 + end + index) * 52 + card]
+        # Only moves on or off the table can move face down cards there
+        if src in ACES:
+            self.founded -= count
+        elif src in TABLES and dst not in TABLES:
+            self.hidden -= sum(1 for card in moving
+                               if not self.visible >> card & 1)
+        if dst in ACES:
+            self.founded += count
+        elif dst in TABLES and src not in TABLES:
+            self.hidden += sum(1 for card in moving
+                               if not self.visible >> card & 1)
+
+    def move_stack(self, src: int, dst: int, count: int) -> None:
+        """ Move the top count cards of the src pile onto the dst pile """
+        self.start_record()
+        # Taking a card from the hand unlocks the next card in the hand
+        if src in HANDS and src != HAND0:
+            if len(self.piles[src - 1]) != 0:
+                self.locked &= ~(1 << self.piles[src - 1][-1])
+
+        # Move the cards over in the same order
+        self.shift(src, dst, count)
+
+        # Make the next card in the old pile in play
+        if len(self.piles[src]) != 0:
+            self.make_in_play(self.piles[src][-1])
+        self.end_record()
+
+    def move_to_hand(self, card: int) -> None:
+        """ Move the card from the top of the deck to the hand """
+        self.start_record()
+        # No card in the furthest spot
+        if len(self.piles[HAND0]) == 0:
+            self.shift(DECK, HAND0, 1)
+        # No card in the middle spot, lock the card in the furthest hand
+        elif len(self.piles[HAND1]) == 0:
+            self.shift(DECK, HAND1, 1)
+            self.locked |= 1 << self.piles[HAND0][-1]
+        # No card in the closest spot, lock the card in the middle hand
+        elif len(self.piles[HAND2]) == 0:
+            self.shift(DECK, HAND2, 1)
+            self.locked |= 1 << self.piles[HAND1][-1]
+        # All hands have cards, move the cards away from the deck
+        else:
+            self.shift(HAND1, HAND0, 1)
+            self.locked |= 1 << self.piles[HAND2][-1]
+            self.shift(HAND2, HAND1, 1)
+            self.shift(DECK, HAND2, 1)
+
+        # Make the card in play
+        self.make_in_play(card)
+        # If there is still a card in the deck, make it clickable
+        if len(self.piles[DECK]) > 0:
+            self.locked &= ~(1 << self.piles[DECK][-1])
+        self.end_record()
+
+    def reset_deck(self) -> None:
+        """ Move the cards in the hand back into the deck """
+        self.start_record()
+        # Move the card from the hand closest to the deck, then the middle,
+        # then the cards in the hand furthest from the deck
+        for hand in (HAND2, HAND1, HAND0):
+            while len(self.piles[hand]) > 0:
+                self.take_out_play(self.piles[hand][-1])
+                self.shift(hand, DECK, 1)
+
+        # Make the top card clickable
+        if len(self.piles[DECK]) != 0:
+            self.locked &= ~(1 << self.piles[DECK][-1])
+        self.end_record()
+
+    def finish(self) -> List[Move]:
+        """
+        Move the top cards of the table to the final piles until the game is
+        won or no card fits, as after can_finish
+        Returns the moves made, in order
+        """
+        moves = []
+        moved = True
+        while moved and self.founded != 52:
+            moved = False
+            for table in TABLES:
+                card = self.top(table)
+                if card == EMPTY:
+                    continue
+                for ace in ACES:
+                    if FOUNDS_ON[card * 53 + self.top(ace)]:
+                        self.move_stack(table, ace, 1)
+                        moves.append((PLACE, table, ace, 1))
+                        moved = True
+                        break
+        return moves
+
+    # =====UNDO===== #
+
+    def start_record(self) -> None:
+        """ Start recording the steps of a move """
+        self.recording = bytearray()
+        self.old_visible = self.visible
+        self.old_locked = self.locked
+
+    def end_record(self) -> None:
+        """ Add the move being recorded to the history """
+        record = self.recording
+        self.recording = None
+        if len(record) == 0:
+            # Nothing moved, nothing to undo
+            return
+
+        # Store the old flags of each card whose flags changed
+        changed = (self.visible ^ self.old_visible) | \
+            (self.locked ^ self.old_locked)
+        record.insert(0, len(record) // 2)
+        while changed:
+            card = (changed & -changed).bit_length() - 1
+            changed &= changed - 1
+            record.append(card << 2 | (self.old_visible >> card & 1) << 1 |
+                          self.old_locked >> card & 1)
+
+        self.history.append(len(record))
+        self.history += record
+        self.history.append(len(record))
+        self.undo_count += 1
+
+        # Forget the oldest moves past the limit
+        if self.undo_limit is not None:
+            while self.undo_count > self.undo_limit:
+                del self.history[:self.history[0] + 2]
+                self.undo_count -= 1
+
+    def undo(self) -> List[int]:
+        """
+        Take back the last move made
+        Returns the sorted numbers of the piles whose cards moved or had
+        their flags put back
+        """
+        if self.undo_count == 0:
+            return []
+        size = self.history[-1]
+        record = self.history[-1 - size:-1]
+        del self.history[-2 - size:]
+        self.undo_count -= 1
+
+        # Move the cards back, the last step first
+        steps = record[0]
+        piles = set()
+        for index in range(steps * 2 - 1, 0, -2):
+            src, dst = record[index] >> 4, record[index] & 15
+            self.move_cards(dst, src, record[index + 1])
+            piles.update((src, dst))
+
+        # Put back the old flags
+        for flags in record[1 + steps * 2:]:
+            card = flags >> 2
+            piles.add(self.where[card])
+            self.turn(card, flags >> 1 & 1 == 1)
+            self.visible &= ~(1 << card)
+            self.visible |= (flags >> 1 & 1) << card
+            self.locked &= ~(1 << card)
+            self.locked |= (flags & 1) << card
+        return sorted(piles)
+
+    def turn(self, card: int, visible: bool) -> None:
+        """ Keep hidden up to date for the card turning face up or down """
+        if self.where[card] in TABLES and \
+                self.visible >> card & 1 != visible:
+            self.hidden += -1 if visible else 1
+
+    def make_in_play(self, card: int) -> None:
+        """ Set necessary properties of the card to make it in play """
+        self.turn(card, True)
+        self.visible |= 1 << card
+        self.locked &= ~(1 << card)
+
+    def take_out_play(self, card: int) -> None:
+        """ Set necessary properties of the card to make it out of play """
+        self.turn(card, False)
+        self.visible &= ~(1 << card)
+        self.locked |= 1 << card
+
+
+def legal_moves(state: GameState) -> List[Move]:
+    """
+    List every move that can be made from state in one pass over the piles,
+    checking each unlocked card against the top of every table and final
+    pile with the lookup tables
+    """
+    piles = state.piles
+    locked = state.locked
+    moves = []
+    # Draw from the deck, or put the hand back once the deck is empty
+    if len(piles[DECK]) != 0:
+        moves.append((DRAW, DECK, HAND0, 1))
+    elif len(piles[HAND0]) + len(piles[HAND1]) + len(piles[HAND2]) != 0:
+        moves.append((RESET, HAND0, DECK, 0))
+
+    ace_tops = [state.top(ace) for ace in ACES]
+    table_tops = [state.top(table) for table in TABLES]
+    for src in range(HAND0, len(PILES)):
+        pile = piles[src]
+        # Every unlocked card can be taken along with the cards on it
+        for index in range(len(pile) - 1, -1, -1):
+            card = pile[index]
+            if locked >> card & 1:
+                break
+            row = card * 53
+            count = len(pile) - index
+            # Only one card can be put on a final pile at a time
+            if count == 1:
+                for a in range(4):
+                    if FOUNDS_ON[row + ace_tops[a]] and ACE0 + a != src:
+                        moves.append((PLACE, src, ACE0 + a, 1))
+            for a in range(7):
+                if STACKS_ON[row + table_tops[a]] and TABLE0 + a != src:
+                    moves.append((PLACE, src, TABLE0 + a, count))
+            if src < TABLE0:
+                # Only the table has stacks of cards that can move
+                break
+    return moves
+
+
+class PileView(MutableSequence):
+    """
+    List of str card keys backed by one pile of a GameState, so code
+    working with card keys changes the state directly
+
+    ===Attributes===
+    state:
+        GameState holding the pile
+    pile:
+        int number of the pile in PILES
+    """
+    state: GameState
+    pile: int
+
+    def __init__(self, state: GameState, pile: int) -> None:
+        """ Initialize a view of the pile in state """
+        self.state = state
+        self.pile = pile
+
+    def __len__(self) -> int:
+        return len(self.state.piles[self.pile])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [KEYS[card] for card in self.state.piles[self.pile][index]]
+        return KEYS[self.state.piles[self.pile][index]]
+
+    def __setitem__(self, index: int, key: str) -> None:
+        if index < 0:
+            index += len(self)
+        self.state.take(self.pile, index)
+        self.state.put(self.pile, index, IDS[key])
+
+    def __delitem__(self, index: int) -> None:
+        self.state.take(self.pile, index)
+
+    def insert(self, index: int, key: str) -> None:
+        self.state.put(self.pile, index, IDS[key])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (list, PileView)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __add__(self, other: List[str]) -> List[str]:
+        return list(self) + list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
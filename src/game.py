@@ -1,9 +1,23 @@
+import os
+import time
 import pygame
+import animation
+import archive
 import card
-import random
-import copy
+import engine
+import render
+import sprites
+import spatial
+import profiler
+import replay
+import deals
+import hints
+import zorder
 import constants as c
-from typing import Tuple, List, Optional, Dict, Union
+from typing import Tuple, List, Optional, Dict
+
+# Event posted by the hint search whenever its best move changes
+HINT_EVENT = pygame.event.custom_type()
 
 
 class Game:
@@ -19,8 +33,48 @@ class Game:
         pygame.Surface to display the game to
     font:
         pygame.font.Font to use to draw text
+    card_sprites:
+        sprites.CardSprites cut from the card sprite sheet, ready to draw
+    table_layer:
+        pygame.Surface of the parts of the game under the cards that never
+        change, drawn once
+    back_runs:
+        render.BackRuns of the drawings of face down runs of cards
+    runs:
+        dict of each pile number pointing to the list of str keys of the
+        face down cards at its bottom, drawn as one run
+    run_keys:
+        set of the str keys of the cards in any run
+    drag_layer:
+        pygame.Surface of the held cards drawn together while they are
+        dragged, or None
+    board:
+        pygame.Surface of the game without the held cards while they are
+        dragged, or None
+    dirty:
+        render.DirtyTracker of the parts of the screen to draw again
     running:
         bool to hold the state of the game
+    minimized:
+        bool of whether the window is minimized or hidden, nothing is drawn
+        while it is
+    focused:
+        bool of whether the window has input focus, nothing is drawn while
+        it does not
+    profiler:
+        profiler.FrameProfiler timing the phases of each frame of run
+    show_profile:
+        bool of whether the frame times are drawn over the game, switched
+        with F3
+    hint:
+        hints.HintSearch for the best move from the current position while
+        hints are shown, switched with H, or None
+    hint_rects:
+        list of pygame.Rect outlines showing the best move found so far
+    animate:
+        bool of whether cards slide to their new spots or jump there
+    animator:
+        animation.Animator of the cards sliding to their new spots
     right_flag:
         bool of whether or not a right click action happened on the last click
     left_flag:
@@ -45,19 +99,46 @@ class Game:
         dict with str keys representing the suit and rank pointing
         to each card.Card object
     card_order:
-        list of str holding the order to draw the cards
+        zorder.ZOrder of the str keys of the cards, in the order to draw
+        them
+    deal_number:
+        int number of the deal being played, the same number always
+        deals the same cards
+    recorder:
+        replay.Recorder of the moves made since the cards were dealt
+    state:
+        engine.GameState holding the piles and the rules of the game,
+        and the moves to undo, up to c.UNDO_LIMIT moves back
+    card_index:
+        spatial.SpatialIndex of where each card is, raised in card_order
+    pile_index:
+        spatial.SpatialIndex of the column each spot in valid_pos is in
     valid_pos:
         dict holding the x and y coordinate of the top left corner
-        of each valid box for a card to sit in, as well as a list
-        of cards in that spot
-    last:
-        list of old game states, used to undo moves, up to 10 moves back
+        of each valid box for a card to sit in, as well as a view of
+        the list of cards in that spot from state
     """
     sprites: Dict[str, pygame.Surface]
     clock: pygame.time.Clock
     screen: pygame.Surface
     font: pygame.font.Font
+    card_sprites: sprites.CardSprites
+    table_layer: pygame.Surface
+    back_runs: render.BackRuns
+    runs: Dict[int, List[str]]
+    run_keys: set
+    drag_layer: Optional[pygame.Surface]
+    board: Optional[pygame.Surface]
+    dirty: render.DirtyTracker
     running: bool
+    minimized: bool
+    focused: bool
+    profiler: profiler.FrameProfiler
+    show_profile: bool
+    hint: Optional[hints.HintSearch]
+    hint_rects: List[pygame.Rect]
+    animate: bool
+    animator: animation.Animator
     right_flag: bool
     left_flag: bool
     held_card: Optional[str]
@@ -67,14 +148,21 @@ class Game:
     old_x: int
     old_y: int
     cards: Dict[str, card.Card]
-    card_order: List[str]
-    valid_pos: Dict[str, Tuple[int, int, List[str]]]
-    last: List[Dict[str, Union[Dict[str, card.Card], List[str],
-                               Dict[str, Tuple[int, int, List[str]]]]]]
+    card_order: zorder.ZOrder
+    deal_number: int
+    recorder: replay.Recorder
+    state: engine.GameState
+    card_index: spatial.SpatialIndex
+    pile_index: spatial.SpatialIndex
+    valid_pos: Dict[str, Tuple[int, int, engine.PileView]]
 
     # =====METHODS FOR STARTING A GAME===== #
-    def __init__(self) -> None:
-        """ Initialize the game """
+    def __init__(self, deal_number: Optional[int] = None,
+                 animate: bool = False) -> None:
+        """
+        Initialize the game, dealing deal_number or a random deal if None,
+        with the cards sliding to their new spots if animate
+        """
         # Load Sprites
         self.sprites = {
             "cards": pygame.image.load("sprites\\cards.png"),
@@ -89,8 +177,29 @@ class Game:
         pygame.display.set_caption("Solitaire")
         self.clock = pygame.time.Clock()
         self.screen = pygame.display.set_mode([c.SCREEN_WIDTH, c.SCREEN_HEIGHT])
+        # Match the sprites to the display now that it exists
+        self.card_sprites = sprites.CardSprites(self.sprites["cards"])
+        self.sprites["undo"] = self.sprites["undo"].convert_alpha()
+        self.table_layer = render.table_layer(self.sprites["undo"])
+        self.back_runs = render.BackRuns(self.card_sprites)
+        self.runs = {}
+        self.run_keys = set()
+        self.drag_layer = None
+        self.board = None
         self.font = pygame.font.SysFont('Arial', 16)
+        self.dirty = render.DirtyTracker()
         self.running = True
+        self.minimized = False
+        self.focused = True
+        self.profiler = profiler.FrameProfiler(
+            ["events", "input", "animate", "draw", "flip"])
+        self.show_profile = False
+        self.hint = None
+        self.hint_rects = []
+        self.animate = animate
+        self.animator = animation.Animator()
+        # Only wake up for mouse movement while the button is down
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
 
         # Setup for game logic
         self.right_flag = False
@@ -104,114 +213,146 @@ class Game:
 
         # Setup the cards and associated variables
         self.cards = {}
-        self.card_order = []
+        self.card_order = zorder.ZOrder()
+        self.card_index = spatial.SpatialIndex()
         self.create_cards()
-        self.valid_pos = {
-            # Position for cards in the deck
-            "DECK": (c.SCREEN_WIDTH - c.CARD_WIDTH * 2, 30, []),
-            # Position for cards in the 3 hand slots
-            "HAND2": (c.SCREEN_WIDTH - c.CARD_WIDTH * 2 - 30 - c.CARD_WIDTH,
-                      30, []),  # x pos for card in the hand
-            "HAND1": (c.SCREEN_WIDTH - c.CARD_WIDTH * 2 - 30 -
-                      c.CARD_WIDTH - c.CARD_WIDTH // 2, 30, []),
-            "HAND0": (c.SCREEN_WIDTH - c.CARD_WIDTH * 2 - 30 -
-                      c.CARD_WIDTH - c.CARD_WIDTH, 30, []),
-            # Position for final stacks starting with ace
-            "ACE0": (30, 30, []),  # x pos for where aces may start piles
-            "ACE1": (60 + c.CARD_WIDTH, 30, []),
-            "ACE2": (90 + 2 * c.CARD_WIDTH, 30, []),
-            "ACE3": (120 + 3 * c.CARD_WIDTH, 30, []),
-            # Position for cards on the table
-            "TABLE0": ((c.SCREEN_WIDTH - (7 * c.CARD_WIDTH + 6 * 30)) // 2,
-                       60 + c.CARD_HEIGHT, []),
-            "TABLE1": ((c.SCREEN_WIDTH - (7 * c.CARD_WIDTH + 6 * 30)) // 2 +
-                       30 + c.CARD_WIDTH,
-                       60 + c.CARD_HEIGHT, []),
-            "TABLE2": ((c.SCREEN_WIDTH - (7 * c.CARD_WIDTH + 6 * 30)) // 2 +
-                       60 + 2 * c.CARD_WIDTH,
-                       60 + c.CARD_HEIGHT, []),
-            "TABLE3": ((c.SCREEN_WIDTH - (7 * c.CARD_WIDTH + 6 * 30)) // 2 +
-                       90 + 3 * c.CARD_WIDTH,
-                       60 + c.CARD_HEIGHT, []),
-            "TABLE4": ((c.SCREEN_WIDTH - (7 * c.CARD_WIDTH + 6 * 30)) // 2 +
-                       120 + 4 * c.CARD_WIDTH,
-                       60 + c.CARD_HEIGHT, []),
-            "TABLE5": ((c.SCREEN_WIDTH - (7 * c.CARD_WIDTH + 6 * 30)) // 2 +
-                       150 + 5 * c.CARD_WIDTH,
-                       60 + c.CARD_HEIGHT, []),
-            "TABLE6": ((c.SCREEN_WIDTH - (7 * c.CARD_WIDTH + 6 * 30)) // 2 +
-                       180 + 6 * c.CARD_WIDTH,
-                       60 + c.CARD_HEIGHT, [])
-        }
-        self.place_cards()
-        self.last = []
+        self.state = engine.GameState(c.UNDO_LIMIT)
+        # Spots of the piles, with the cards in each
+        self.valid_pos = {key: (x, y, []) for key, (x, y) in
+                          c.PILE_SPOTS.items()}
+        self.link_piles()
+        # Index each spot by the column under it, as tables grow downwards
+        self.pile_index = spatial.SpatialIndex()
+        for key in self.valid_pos:
+            self.pile_index.place(
+                key, self.valid_pos[key][0], self.valid_pos[key][1],
+                c.CARD_WIDTH, c.SCREEN_HEIGHT - self.valid_pos[key][1])
+        self.place_cards(deal_number)
 
     def create_cards(self) -> None:
         """ Method to create a dict of 52 cards """
         for i in range(4):
             for j in range(13):
                 self.cards[c.SUITS[i] + c.RANKS[j]] = card.Card(i, j)
-                self.card_order.append(c.SUITS[i] + c.RANKS[j])
-
-    def place_cards(self) -> None:
-        """ Shuffle and place the cards for a new game """
-        # Variable to keep track of which card is being placed
-        on_card = 0
-
-        # Shuffle the cards
-        random.shuffle(self.card_order)
-
-        # Place the cards on the 7 table slots
-        for a in range(7):
-            for i in range(a + 1):
-                self.cards[self.card_order[on_card]].set_x(
-                    self.valid_pos["TABLE" + str(a)][0])
-                self.cards[self.card_order[on_card]].set_y(
-                    self.valid_pos["TABLE" + str(a)][1] + i * 15)
-                self.valid_pos["TABLE" + str(a)][2].append(
-                    self.card_order[on_card])
-                if i != a:
-                    # Flip all but the last card and make them immovable
-                    self.cards[self.card_order[on_card]].set_visible(False)
-                    self.cards[self.card_order[on_card]].set_locked(True)
-                on_card += 1
-
-        # Place the remaining cards in the deck position
-        while on_card < len(self.card_order):
-            self.cards[self.card_order[on_card]].set_x(
-                self.valid_pos["DECK"][0])
-            self.cards[self.card_order[on_card]].set_y(
-                self.valid_pos["DECK"][1])
-            self.valid_pos["DECK"][2].append(self.card_order[on_card])
-            self.cards[self.card_order[on_card]].visible = False
-            self.cards[self.card_order[on_card]].locked = True
-            on_card += 1
-
-        # Allow the top deck card to be moved
-        self.cards[self.card_order[on_card - 1]].set_locked(False)
-
-    def save_state(self) -> Dict[str,
-                                 Union[Dict[str, card.Card], List[str],
-                                       Dict[str, Tuple[int, int, List[str]]]]]:
+                self.card_order.raise_key(c.SUITS[i] + c.RANKS[j])
+
+    def link_piles(self) -> None:
+        """ Point the card list of each spot in valid_pos at its pile """
+        for key in self.valid_pos:
+            self.valid_pos[key] = (
+                self.valid_pos[key][0], self.valid_pos[key][1],
+                engine.PileView(self.state, engine.PILE_NUMBERS[key]))
+
+    def place_cards(self, deal_number: Optional[int] = None) -> None:
+        """
+        Shuffle and place the cards for deal_number, or a random deal
+        if None
+        """
+        # Shuffle the cards the same way every time for the deal
+        if deal_number is None:
+            deal_number = deals.random_deal_number()
+        self.deal_number = deal_number
+        self.recorder = replay.Recorder(deal_number)
+        self.card_order = zorder.ZOrder(
+            engine.KEYS[number] for number in deals.deal_order(deal_number))
+        for key in self.card_order:
+            self.card_index.raise_key(key)
+
+        # Deal the cards, then move them to where they were placed
+        self.state.deal(engine.IDS[key] for key in self.card_order)
+        self.layout(*range(len(engine.PILES)))
+        # A new deal starts with every card in its spot
+        self.finish_slides()
+
+    def spot(self, pile: int, index: int) -> Tuple[int, int]:
+        """ Get the x and y of the card at index of the pile """
+        x, y, _ = self.valid_pos[engine.PILES[pile]]
+        # Cards on the table are spread out, the rest sit on each other
+        if pile in engine.TABLES:
+            return x, y + 15 * index
+        return x, y
+
+    def layout(self, *piles: int) -> None:
+        """ Move the cards of each pile to their spot and match the state """
+        for pile in piles:
+            keys = self.valid_pos[engine.PILES[pile]][2]
+            for index, key in enumerate(keys):
+                self.place_card(key, *self.spot(pile, index))
+                self.cards[key].set_visible(
+                    self.state.is_visible(engine.IDS[key]))
+                self.cards[key].set_locked(
+                    self.state.is_locked(engine.IDS[key]))
+        self.find_runs(*piles)
+
+    def find_runs(self, *piles: int) -> None:
+        """
+        Find the face down cards at the bottom of each pile, drawn at once,
+        leaving out any still sliding in until they stop
+        """
+        for pile in piles:
+            keys = self.valid_pos[engine.PILES[pile]][2]
+            self.run_keys.difference_update(self.runs.get(pile, []))
+            run = []
+            for key in keys:
+                if self.cards[key].get_visible() or \
+                        self.animator.end_of(key) is not None:
+                    break
+                run.append(key)
+            self.runs[pile] = run
+            self.run_keys.update(run)
+
+    def save_state(self) -> bytes:
         """ Method to copy information needed to recreate the game state """
-        return {
-            "cards": copy.deepcopy(self.cards),
-            "card_order": copy.deepcopy(self.card_order),
-            "valid_pos": copy.deepcopy(self.valid_pos)
-        }
+        return self.state.pack()
 
-    def reset(self) -> None:
-        """ Method to reset the game """
+    def save_game(self, path: str) -> None:
+        """ Method to save the game in progress to a file at path """
+        archive.save(path, self.deal_number, self.state)
+
+    def load_game(self, path: str) -> None:
+        """
+        Method to carry on a game saved with save_game
+        The moves made before it was saved can not be undone, and the
+        recorder only holds the moves made after loading
+        """
+        deal_number, state = archive.load(path)
+        self.reset(deal_number)
+        state.undo_limit = c.UNDO_LIMIT
+        self.state = state
+        self.link_piles()
+        # Draw the cards of each pile over the one before, bottom card first
+        for pile in range(len(engine.PILES)):
+            for key in self.valid_pos[engine.PILES[pile]][2]:
+                self.raise_card(key)
+        self.layout(*range(len(engine.PILES)))
+        self.finish_slides()
+        self.dirty.invalidate()
+
+    def position_key(self) -> int:
+        """ Method to get a 64 bit hash that is the same for equal states """
+        return self.state.zobrist()
+
+    def reset(self, deal_number: Optional[int] = None) -> None:
+        """
+        Method to deal a new game with the cards, sprites and display
+        already loaded, dealing deal_number or a random deal if None
+        """
         self.right_flag = False
         self.left_flag = False
         self.held_card = None
         self.held_stack = []
+        self.drag_layer = None
+        self.board = None
         self.x_offset = 0
         self.y_offset = 0
         self.old_x = 0
         self.old_y = 0
-        self.create_cards()
-        self.place_cards()
+        self.stop_hint()
+        # Wake up for mouse movement only once a card is grabbed again
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
+        # Shuffle the same cards back onto the table
+        self.place_cards(deal_number)
+        self.dirty.invalidate()
 
     # =====GAME LOGIC METHODS===== #
 
@@ -221,33 +362,37 @@ class Game:
         run_menu = True
         # Variable to track if the player wants to play or quit
         play = False
+
+        # Draw the screen once, nothing on it changes
+        # Fill the background
+        self.screen.fill(c.BACK_COLOUR)
+        # Draw the logo
+        self.screen.blit(
+            self.sprites["large_logo"], (c.SCREEN_WIDTH // 2 - 148,
+                                         c.SCREEN_HEIGHT // 2 - 79))
+        # Draw the message
+        text = self.font.render(
+            "Press Space to Play!", True, (255, 255, 255))
+        text_rect = text.get_rect(
+            center=(c.SCREEN_WIDTH // 2, c.SCREEN_HEIGHT // 2 + 100))
+        self.screen.blit(text, text_rect)
+        # Flip the Screen
+        pygame.display.flip()
+
         while run_menu:
-            for event in pygame.event.get():
-                # Check quit
-                if event.type == pygame.QUIT:
+            # Sleep until something happens
+            event = pygame.event.wait()
+            # Check quit
+            if event.type == pygame.QUIT:
+                run_menu = False
+            # Check for input to continue
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
                     run_menu = False
-                # Check for input to continue
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        run_menu = False
-                        play = True
-
-            # Draw the screen
-            # Fill the background
-            self.screen.fill(c.BACK_COLOUR)
-            # Draw the logo
-            self.screen.blit(
-                self.sprites["large_logo"], (c.SCREEN_WIDTH // 2 - 148,
-                                             c.SCREEN_HEIGHT // 2 - 79))
-            # Draw the message
-            text = self.font.render(
-                "Press Space to Play!", True, (255, 255, 255))
-            text_rect = text.get_rect(
-                center=(c.SCREEN_WIDTH // 2, c.SCREEN_HEIGHT // 2 + 100))
-            self.screen.blit(text, text_rect)
-
-            # Flip the Screen
-            pygame.display.flip()
+                    play = True
+            # Show the screen again if the window was covered
+            if event.type == pygame.WINDOWEXPOSED:
+                pygame.display.flip()
 
         # Check to continue or quit
         if play:
@@ -255,32 +400,27 @@ class Game:
 
     def run(self) -> None:
         """Method to run the game"""
+        # Draw the first frame before waiting for input
+        self.draw()
         while self.running:
-            # Start the clock
-            self.clock.tick(60)
-
-            # Check quit
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-
-            # Get information about the mouse
-            mouse_pressed = pygame.mouse.get_pressed(3)
-            mouse_x = pygame.mouse.get_pos()[0]
-            mouse_y = pygame.mouse.get_pos()[1]
-
-            # Interact with the screen from the mouse
-            # Left click
-            if mouse_pressed[0]:
-                # Left click has happened
-                self.left_click(mouse_x, mouse_y)
-            elif self.held_card is not None:
-                # No left click, but a card was held on last iteration, meaning
-                # the card is being let go of
-                self.let_go(mouse_x, mouse_y)
-            elif self.left_flag:
-                # No left click, no card to drop, nothing happens this move
-                self.left_flag = False
+            events = self.wait_events()
+            for index, event in enumerate(events):
+                # Only the last of the mouse movements in a row matters
+                if event.type == pygame.MOUSEMOTION and \
+                        index + 1 < len(events) and \
+                        events[index + 1].type == pygame.MOUSEMOTION:
+                    continue
+                self.handle_event(event)
+            # Once nothing is left to turn over, finish the game at once
+            if self.held_card is None and self.state.can_finish() and \
+                    not self.state.is_won():
+                self.auto_finish()
+            self.profiler.lap("input")
+
+            # Move the sliding cards to where they are by now
+            if self.animator.busy():
+                self.step_slides()
+            self.profiler.lap("animate")
 
             # Right click
             # Unused, kept from development
@@ -291,88 +431,234 @@ class Game:
                 # Right click is over
                 # self.right_flag = False
 
-            # Draw to the screen
-            self.draw()
+            # Draw to the screen, unless nobody can see it
+            if not self.minimized and self.focused:
+                rects = self.draw_dirty()
+                self.profiler.lap("draw")
+                # Update the changed parts of the screen
+                if len(rects) != 0:
+                    pygame.display.update(rects)
+                self.profiler.lap("flip")
+            self.profiler.end()
 
             # Check for a win
             if self.check_win():
-                self.play_again()
+                if self.play_again():
+                    # Start the next game in this loop, not a new one
+                    self.reset()
+                    self.draw()
+                else:
+                    self.running = False
 
-    def play_again(self) -> None:
-        """ Method to control the end of the game """
+    def wait_events(self) -> List[pygame.event.Event]:
+        """
+        Get the events to handle, sleeping until there is one unless a card
+        is being dragged
+        """
+        if self.held_card is not None or self.animator.busy():
+            # Keep to 60 frames a second while cards follow the mouse or
+            # slide to their spots
+            self.clock.tick(60)
+            events = []
+        else:
+            # Nothing is moving, so nothing changes until there is input
+            events = [pygame.event.wait()]
+        # The frame starts once the sleep is over
+        self.profiler.begin()
+        events += pygame.event.get()
+        self.profiler.lap("events")
+        return events
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        """ Method to react to one event from pygame """
+        # Check quit
+        if event.type == pygame.QUIT:
+            self.running = False
+            self.stop_hint()
+        # Left click has happened
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            # Cards are only picked up from their spots
+            self.finish_slides()
+            pygame.event.set_allowed(pygame.MOUSEMOTION)
+            self.left_click(event.pos[0], event.pos[1])
+        # The mouse moved with the left button down
+        elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+            self.left_click(event.pos[0], event.pos[1])
+        # Left click is over
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
+            if self.held_card is not None:
+                # A card was held, meaning the card is being let go of
+                self.let_go(event.pos[0], event.pos[1])
+            elif self.left_flag:
+                # No card to drop, nothing happens this move
+                self.left_flag = False
+        elif event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+            self.minimized = True
+        elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN):
+            self.minimized = False
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+            # The button may come up in another window, put any card back
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
+            if self.held_card is not None:
+                self.let_go(self.old_x, self.old_y)
+            self.left_flag = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+        elif event.type == pygame.WINDOWEXPOSED:
+            # Show the last frame again where the window was covered
+            pygame.display.flip()
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            # Show or hide the frame times, drawing under them again
+            self.show_profile = not self.show_profile
+            self.dirty.invalidate()
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F12:
+            self.profiler.dump(c.PROFILE_FILE)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+            self.save_game(c.SAVE_FILE)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+            # Carry on the saved game, if there is one
+            if os.path.exists(c.SAVE_FILE):
+                self.load_game(c.SAVE_FILE)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+            # Show or hide the best next move
+            if self.hint is None:
+                self.start_hint()
+            else:
+                self.stop_hint()
+        elif event.type == HINT_EVENT:
+            # The search found a better move, or stopped
+            self.show_hint()
+
+    def play_again(self) -> bool:
+        """
+        Method to control the end of the game
+        Returns whether the player wants to play again
+        """
         # Variable to keep the loop running
         run_menu = True
         # Variable to track if the player wants to play or quit
         play = False
+
+        # Draw the screen once, nothing on it changes
+        # Draw the background, borders and redo button
+        self.screen.blit(self.table_layer, (0, 0))
+
+        # Draw the cards
+        for key in self.card_order:
+            self.cards[key].draw(self.card_sprites, self.screen)
+
+        # Draw the message
+        text = self.font.render(
+            "You win! Press Space to Replay!", True, (255, 255, 255))
+        text_rect = text.get_rect(
+            center=(c.SCREEN_WIDTH // 2, c.SCREEN_HEIGHT // 2 + 100))
+        self.screen.blit(text, text_rect)
+        # Flip the Screen
+        pygame.display.flip()
+
         while run_menu:
-            for event in pygame.event.get():
-                # Check quit
-                if event.type == pygame.QUIT:
+            # Sleep until something happens
+            event = pygame.event.wait()
+            # Check quit
+            if event.type == pygame.QUIT:
+                run_menu = False
+            # Check for input to continue
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
                     run_menu = False
-                # Check for input to continue
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        run_menu = False
-                        play = True
-
-            # Draw the screen
-            # Fill the background
-            self.screen.fill(c.BACK_COLOUR)
-
-            # Draw border for the valid positions except the hand
-            for key in self.valid_pos:
-                if "HAND" not in key:
-                    pygame.draw.rect(
-                        self.screen, (255, 255, 255),
-                        pygame.Rect(
-                            self.valid_pos[key][0],
-                            self.valid_pos[key][1],
-                            c.CARD_WIDTH, c.CARD_HEIGHT), 1)
-
-            # Draw the cards
-            for key in self.card_order:
-                self.cards[key].draw(self.sprites["cards"], self.screen)
-
-            # Draw the message
-            text = self.font.render(
-                "You win! Press Space to Replay!", True, (255, 255, 255))
-            text_rect = text.get_rect(
-                center=(c.SCREEN_WIDTH // 2, c.SCREEN_HEIGHT // 2 + 100))
-            self.screen.blit(text, text_rect)
-
-            # Flip the Screen
-            pygame.display.flip()
+                    play = True
+            # Show the screen again if the window was covered
+            if event.type == pygame.WINDOWEXPOSED:
+                pygame.display.flip()
 
         # Check to continue or quit
-        if play:
-            self.__init__()
-            self.run()
+        return play
 
     def draw(self) -> None:
-        """ Draw an active game to the screen """
-        # Fill the screen with green
-        self.screen.fill(c.BACK_COLOUR)
-
-        # Draw border for the valid positions except the hand
-        for key in self.valid_pos:
-            if "HAND" not in key:
-                pygame.draw.rect(
-                    self.screen, (255, 255, 255),
-                    pygame.Rect(
-                        self.valid_pos[key][0],
-                        self.valid_pos[key][1], c.CARD_WIDTH, c.CARD_HEIGHT), 1)
-
-        # Draw the redo button
-        self.screen.blit(
-            self.sprites["undo"], (c.SCREEN_WIDTH - 75,
-                                   c.SCREEN_HEIGHT - 75))
-
-        # Draw the cards
-        for key in self.card_order:
-            self.cards[key].draw(self.sprites["cards"], self.screen)
+        """ Draw the parts of an active game that changed to the screen """
+        rects = self.draw_dirty()
+        # Update the changed parts of the screen
+        if len(rects) != 0:
+            pygame.display.update(rects)
 
-        # Flip the Screen
-        pygame.display.flip()
+    def draw_dirty(self) -> List[pygame.Rect]:
+        """
+        Draw the parts of an active game that changed onto the screen
+        surface, and get the parts drawn
+        """
+        rects = self.dirty.find_dirty(self.cards, self.card_order)
+        if self.show_profile:
+            # The frame times change every frame
+            rects = render.merge_rects(rects + [pygame.Rect(c.PROFILE_RECT)])
+        if len(rects) == 0:
+            # Nothing changed, nothing to draw
+            return rects
+
+        for rect in rects:
+            # Only draw inside of the changed part
+            self.screen.set_clip(rect)
+            if self.board is not None:
+                # Dragging, nothing changes under the held cards
+                self.screen.blit(self.board, rect, rect)
+                self.screen.blit(self.drag_layer, (
+                    self.cards[self.held_card].get_x(),
+                    self.cards[self.held_card].get_y()))
+            else:
+                self.draw_area(rect)
+        self.screen.set_clip(None)
+
+        # Outline the hint over the cards
+        for rect in self.hint_rects:
+            pygame.draw.rect(self.screen, c.HINT_COLOUR, rect, 2)
+        if self.show_profile:
+            self.draw_profile()
+        return rects
+
+    def draw_area(self, rect: pygame.Rect, skip: frozenset = frozenset(),
+                  surface: Optional[pygame.Surface] = None) -> None:
+        """
+        Draw the table and the cards not in skip inside of rect onto surface,
+        or the screen if None
+        """
+        if surface is None:
+            surface = self.screen
+        self.draw_table(rect, surface)
+        # Draw the cards in this part
+        for key in render.cards_in(rect, self.cards, self.card_order):
+            if key not in self.run_keys and key not in skip:
+                self.cards[key].draw(self.card_sprites, surface)
+
+    def draw_profile(self) -> None:
+        """ Draw the frame times over the game """
+        x, y, width, height = c.PROFILE_RECT
+        self.screen.fill((0, 0, 0), (x, y, width, height))
+        for index, line in enumerate(self.profiler.overlay_lines()):
+            self.screen.blit(self.font.render(line, True, (255, 255, 255)),
+                             (x + 4, y + 2 + 19 * index))
+
+    def draw_table(self, rect: pygame.Rect,
+                   surface: Optional[pygame.Surface] = None) -> None:
+        """
+        Draw the parts of the game under the cards inside of rect onto
+        surface, or the screen if None
+        """
+        if surface is None:
+            surface = self.screen
+        # Copy the background, borders and redo button drawn ahead of time
+        surface.blit(self.table_layer, rect, rect)
+
+        # Draw the face down runs, the cards on them go over them
+        for pile, run in self.runs.items():
+            if len(run) == 0:
+                continue
+            x, y = self.spot(pile, 0)
+            # Only the table spreads its cards, the deck shows one back
+            drawing = self.back_runs.get(
+                len(run) if pile in engine.TABLES else 1)
+            if rect.colliderect((x, y), drawing.get_size()):
+                surface.blit(drawing, (x, y))
 
     def right_click(self,  mouse_x: int, mouse_y: int) -> None:
         """ Control a right click """
@@ -384,8 +670,7 @@ class Game:
         if pressed is not None and not self.right_flag \
                 and not self.cards[pressed[1]].get_locked():
             # Move the card to the top of the order
-            self.card_order.pop(pressed[0])
-            self.card_order.append(pressed[1])
+            self.raise_card(pressed[1])
             # Flip the clicked card
             self.cards[pressed[1]].flip_visible()
             # Flag that a card was flipped
@@ -409,9 +694,6 @@ class Game:
                         mouse_x, mouse_y, self.valid_pos["DECK"][0],
                         self.valid_pos["DECK"][1], c.CARD_WIDTH, c.CARD_HEIGHT):
                 # In this case, deck is empty, reset the cards in hand to deck
-                self.last.append(self.save_state())
-                if len(self.last) > 10:
-                    self.last.pop(0)
                 self.reset_deck()
             elif not self.left_flag and\
                 self.check_in_box(mouse_x, mouse_y, c.SCREEN_WIDTH - 75,
@@ -425,122 +707,121 @@ class Game:
         elif pressed is not None \
                 and not self.cards[pressed[1]].get_locked() \
                 and not self.left_flag:
-            # Save the game state before moving any cards
-            self.last.append(self.save_state())
-            if len(self.last) > 10:
-                self.last.pop(0)
             # Grab the card
             self.grab_cards(pressed[0], pressed[1], mouse_x, mouse_y)
 
     def let_go(self, mouse_x: int, mouse_y: int) -> None:
         """ Handle a card being put down """
+        self.end_drag()
         # Get which pile it is dropping into and which pile it came from
         pile = self.check_pile(mouse_x, mouse_y)
         old_pile = self.check_pile(self.old_x, self.old_y)
 
         # No new pile or the same pile
         if pile is None or pile == old_pile:
-            # Card is in the same spot, pop the saved state to avoid duplicates
-            if len(self.last) != 0:
-                self.last.pop()
             # Put the card back
-            self.cards[self.held_card].set_x(self.old_x)
-            self.cards[self.held_card].set_y(self.old_y)
+            self.place_card(self.held_card, self.old_x, self.old_y)
             # Put any cards in the held_stack back
             for index, key in enumerate(self.held_stack):
-                self.cards[key].set_x(self.old_x)
-                self.cards[key].set_y(self.old_y + 15 * (index + 1))
+                self.place_card(key, self.old_x, self.old_y + 15 * (index + 1))
             # Mark no card being held, and empty the held_stack
             self.held_card = None
             self.held_stack = []
             return
 
-        # Taking a card from the hand
-        if "HAND" in old_pile:
-            # Unlock the next applicable card from the hand
-            if old_pile == "HAND0":
-                if len(self.valid_pos["HAND0"][2]) > 1:
-                    self.cards[self.valid_pos["HAND0"][2][-1]].set_locked(False)
-            elif old_pile == "HAND1":
-                self.cards[self.valid_pos["HAND0"][2][-1]].set_locked(False)
-            elif old_pile == "HAND2":
-                self.cards[self.valid_pos["HAND1"][2][-1]].set_locked(False)
-
-        # Put a card on the table
-        if "TABLE" in pile:
-            # Check if the card matches the pattern
-            if self.will_table_take(pile):
-                # Move the card to the pile
-                self.cards[self.held_card].set_x(self.valid_pos[pile][0])
-                self.cards[self.held_card].set_y(
-                    self.valid_pos[pile][1] + 15 * len(self.valid_pos[pile][2]))
-                self.valid_pos[old_pile][2].remove(self.held_card)
-                self.valid_pos[pile][2].append(self.held_card)
-
-                # Move the card in held_stack to the new pile on the table
-                for key in self.held_stack:
-                    self.cards[key].set_x(self.valid_pos[pile][0])
-                    self.cards[key].set_y(
-                        self.valid_pos[pile][1] + 15 * len(
-                            self.valid_pos[pile][2]))
-                    self.valid_pos[old_pile][2].remove(key)
-                    self.valid_pos[pile][2].append(key)
-
-                # Make the bottom card in the pile taken from in play
-                if len(self.valid_pos[old_pile][2]) >= 1:
-                    self.make_in_play(self.valid_pos[old_pile][2][-1])
-
-                # No card is held, nothing in the stack to move alongside
-                self.held_card = None
-                self.held_stack = []
-
-                # Card was put down, nothing else to check
-                return
-
-        # Put into a final pile
-        elif "ACE" in pile:
-            # Check to see if more than one card is being moved
-            if len(self.held_stack) != 0:
-                # Only one card can be put at a time, move the cards back
-                self.cards[self.held_card].set_x(self.old_x)
-                self.cards[self.held_card].set_y(self.old_y)
-                for index, key in enumerate(self.held_stack):
-                    self.cards[key].set_x(self.old_x)
-                    self.cards[key].set_y(self.old_y + 15 * (index + 1))
-            # Check if the card meets the pattern
-            elif self.will_ace_take(pile):
-                # Move the card to the slot
-                self.cards[self.held_card].set_x(self.valid_pos[pile][0])
-                self.cards[self.held_card].set_y(self.valid_pos[pile][1])
-                self.valid_pos[old_pile][2].remove(self.held_card)
-                self.valid_pos[pile][2].append(self.held_card)
-                # Make the next card in the old pile in play
-                if len(self.valid_pos[old_pile][2]) >= 1:
-                    self.make_in_play(self.valid_pos[old_pile][2][-1])
-                # No card held, and nothing in the stack to move
-                self.held_card = None
-                self.held_stack = []
-                # Card was placed, nothing else to check
-                return
+        # Check if the card and its stack match the pattern of the pile
+        src = engine.PILE_NUMBERS[old_pile]
+        dst = engine.PILE_NUMBERS[pile]
+        count = len(self.held_stack) + 1
+        if self.state.will_take(engine.IDS[self.held_card], count, dst):
+            # Move the cards to the pile
+            self.place_stack(src, dst, count)
+            # No card is held, nothing in the stack to move alongside
+            self.held_card = None
+            self.held_stack = []
+            # Card was put down, nothing else to check
+            return
 
         # Card is not being put in a proper spot, move it and the stack back
-        self.cards[self.held_card].set_x(self.old_x)
-        self.cards[self.held_card].set_y(self.old_y)
+        self.place_card(self.held_card, self.old_x, self.old_y)
         for index, key in enumerate(self.held_stack):
-            self.cards[key].set_x(self.old_x)
-            self.cards[key].set_y(self.old_y + 15 * (index + 1))
+            self.place_card(key, self.old_x, self.old_y + 15 * (index + 1))
 
         # No card is held and nothing in the stack
         self.held_card = None
         self.held_stack = []
 
+    def place_stack(self, src: int, dst: int, count: int) -> None:
+        """ Move the top count cards of the src pile onto the dst pile """
+        # The cards moving go on top of the order
+        for key in self.valid_pos[engine.PILES[src]][2][-count:]:
+            self.raise_card(key)
+        self.state.apply((engine.PLACE, src, dst, count))
+        self.recorder.record((engine.PLACE, src, dst, count))
+        self.layout(src, dst)
+        if src in engine.HANDS:
+            # Taking from the hand unlocks the card in the spot before it
+            self.layout(*engine.HANDS)
+        self.restart_hint()
+
+    def play_replay(self, data: bytes, frame_ms: int = 300) -> None:
+        """
+        Method to deal the game of a recording again and show its moves,
+        one every frame_ms after the cards of the last move stop sliding
+        """
+        deal_number, moves = replay.read(data)
+        self.place_cards(deal_number)
+        self.dirty.invalidate()
+        self.draw()
+        for kind, src, dst, count in moves:
+            if not self.replay_open():
+                return
+            pygame.time.wait(frame_ms)
+
+            if kind == replay.UNDO:
+                self.undo()
+            elif kind == engine.DRAW:
+                self.move_to_hand(self.valid_pos["DECK"][2][-1])
+            elif kind == engine.RESET:
+                self.reset_deck()
+            else:
+                self.place_stack(src, dst, count)
+            # Show the cards sliding to their new spots, a frame at a time
+            while self.animator.busy():
+                if not self.replay_open():
+                    self.finish_slides()
+                    return
+                self.clock.tick(60)
+                self.step_slides()
+                self.draw()
+            self.draw()
+
+    def replay_open(self) -> bool:
+        """ Check if the window is still open while a replay is shown """
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+        return self.running
+
     def check_win(self) -> bool:
         """ Check if the win condition is met """
-        # If all 4 Ace spots are full, there is a win
-        for a in range(4):
-            if len(self.valid_pos["ACE" + str(a)]) != 13:
-                return False
-        return True
+        # If all 52 cards are on the Ace spots, there is a win
+        return self.state.is_won()
+
+    def auto_finish(self) -> None:
+        """
+        Move every card left on the table to the Ace spots in one go, each
+        as its own move to record and undo
+        """
+        moves = self.state.finish()
+        for move in moves:
+            self.recorder.record(move)
+        # Put the cards of the Ace spots on top, bottom card first
+        for pile in engine.ACES:
+            for key in self.valid_pos[engine.PILES[pile]][2]:
+                self.raise_card(key)
+        self.layout(*engine.ACES, *engine.TABLES)
+        self.restart_hint()
 
     # =====HELPER METHODS===== #
 
@@ -548,8 +829,7 @@ class Game:
                    mouse_x: int, mouse_y: int) -> None:
         """ Grab the card and cards below it if on the table"""
         # Move the new cards key to the top of the card_order
-        self.card_order.pop(index)
-        self.card_order.append(key)
+        self.raise_card(key)
         # Get the x and y offset for this card on this click
         self.x_offset = self.cards[key].calc_x_offset(mouse_x)
         self.y_offset = self.cards[key].calc_y_offset(mouse_y)
@@ -576,89 +856,123 @@ class Game:
 
         # Move any cards taken with the grabbed card to the top of the order
         for extra in self.held_stack:
-            self.card_order.pop(self.card_order.index(extra))
-            self.card_order.append(extra)
+            self.raise_card(extra)
 
         # Store which card was grabbed
         self.held_card = key
+        self.start_drag()
         # Move cards that need to be moved
         self.move_cards(mouse_x, mouse_y)
 
+    def start_drag(self) -> None:
+        """
+        Draw the held cards onto one surface and the game without them onto
+        another, so each frame of the drag only copies the two
+        The screen is left as it is, it still shows the held cards until
+        they move
+        """
+        held = [self.held_card] + self.held_stack
+        self.drag_layer = render.stack_layer(
+            self.card_sprites, [self.cards[key] for key in held])
+        self.board = self.screen.copy()
+        self.draw_area(self.screen.get_rect(), frozenset(held), self.board)
+
+    def end_drag(self) -> None:
+        """ Go back to drawing the held cards one at a time """
+        if self.board is None:
+            return
+        self.drag_layer = None
+        self.board = None
+        # Put the held cards in card_index where they were let go
+        for key in [self.held_card] + self.held_stack:
+            self.move_card(key, self.cards[key].get_x(),
+                           self.cards[key].get_y())
+
     def move_cards(self, x: int, y: int):
         """ Move held_card and any cards in held_stack """
-        # Move held_card
-        self.cards[self.held_card].set_x(x - self.x_offset)
-        self.cards[self.held_card].set_y(y - self.y_offset)
-
-        # Move the cards in held_stack
-        for offset, key in enumerate(self.held_stack):
-            self.cards[key].set_x(x - self.x_offset)
-            self.cards[key].set_y(y - self.y_offset + 15 * (offset + 1))
+        # Move held_card, then the cards in held_stack below it
+        for offset, key in enumerate([self.held_card] + self.held_stack):
+            new_x = x - self.x_offset
+            new_y = y - self.y_offset + 15 * offset
+            if self.board is not None:
+                # The held cards are drawn as one while dragged, card_index
+                # catches up once they are let go
+                self.cards[key].set_x(new_x)
+                self.cards[key].set_y(new_y)
+            else:
+                self.move_card(key, new_x, new_y)
+
+    def move_card(self, key: str, x: int, y: int) -> None:
+        """ Move the card to x, y and keep card_index up to date """
+        self.cards[key].set_x(x)
+        self.cards[key].set_y(y)
+        self.card_index.place(key, self.cards[key].get_x(),
+                              self.cards[key].get_y(),
+                              c.CARD_WIDTH, c.CARD_HEIGHT)
+
+    def place_card(self, key: str, x: int, y: int) -> None:
+        """ Send the card to x, y, sliding it there if animate """
+        if not self.animate:
+            self.move_card(key, x, y)
+            return
+        now = (self.cards[key].get_x(), self.cards[key].get_y())
+        if now != (x, y) and self.animator.end_of(key) != (x, y):
+            self.animator.slide(key, now, (x, y))
+
+    def step_slides(self) -> None:
+        """ Move the sliding cards to where they are at this moment """
+        self.animator.advance(time.perf_counter())
+        stopped = set()
+        for key, (x, y) in self.animator.positions().items():
+            self.move_card(key, x, y)
+            if self.animator.end_of(key) is None:
+                # Done sliding, it can join the run of its pile
+                stopped.add(self.state.find(engine.IDS[key]))
+        self.find_runs(*stopped)
+
+    def finish_slides(self) -> None:
+        """ Move every sliding card straight to its spot """
+        places = self.animator.finish()
+        for key, (x, y) in places.items():
+            self.move_card(key, x, y)
+        self.find_runs(*{self.state.find(engine.IDS[key]) for key in places})
+
+    def raise_card(self, key: str) -> None:
+        """ Move the card to the top of the card_order """
+        self.card_order.raise_key(key)
+        self.card_index.raise_key(key)
 
     def make_in_play(self, key: str) -> None:
         """ Set necessary properties of the card to make it in play """
+        self.state.make_in_play(engine.IDS[key])
         self.cards[key].set_visible(True)
         self.cards[key].set_locked(False)
 
     def take_out_play(self, key: str) -> None:
         """ Set necessary properties of the card to make it out of play """
+        self.state.take_out_play(engine.IDS[key])
         self.cards[key].set_visible(False)
         self.cards[key].set_locked(True)
 
     def reset_deck(self) -> None:
         """ Move the cards in the hand back into the deck """
-        if len(self.valid_pos["HAND2"][2]) > 0:
-            # Move the card from the hand closest to the deck
-            # Pop the card
-            to_move = self.valid_pos["HAND2"][2].pop(-1)
-            # Move it to the top of the order
-            self.card_order.remove(to_move)
-            self.card_order.append(to_move)
-            # Add the card to the deck
-            self.valid_pos["DECK"][2].append(to_move)
-            # Move the card to the deck
-            self.cards[to_move].set_x(self.valid_pos["DECK"][0])
-            self.cards[to_move].set_y(self.valid_pos["DECK"][1])
-            # Take the card of play
-            self.take_out_play(to_move)
-
-        if len(self.valid_pos["HAND1"][2]) > 0:
-            # Move the card from the middle deck
-            # Pop the card
-            to_move = self.valid_pos["HAND1"][2].pop(-1)
-            # Move the card to the top of the order
-            self.card_order.remove(to_move)
-            self.card_order.append(to_move)
-            # Add the card to the deck
-            self.valid_pos["DECK"][2].append(to_move)
-            # Move the card to the deck
-            self.cards[to_move].set_x(self.valid_pos["DECK"][0])
-            self.cards[to_move].set_y(self.valid_pos["DECK"][1])
-            # Take the card out of play
-            self.take_out_play(to_move)
-
-        # Move the cards in the hand furthest from the deck
-        for key in reversed(self.valid_pos["HAND0"][2]):
-            # Remove the card from the hand
-            self.valid_pos["HAND0"][2].remove(key)
-            # Add the card to the deck
-            self.valid_pos["DECK"][2].append(key)
-            # Move the card to the top of the order
-            self.card_order.remove(key)
-            self.card_order.append(key)
-            # Move the card to the deck
-            self.cards[key].set_x(self.valid_pos["DECK"][0])
-            self.cards[key].set_y(self.valid_pos["DECK"][1])
-            # Take the card out of play
-            self.take_out_play(key)
-
-        # Make the top card clickable
-        if len(self.valid_pos["DECK"][2]) != 0:
-            self.cards[self.valid_pos["DECK"][2][-1]].set_locked(False)
+        deck = self.valid_pos["DECK"][2]
+        old_size = len(deck)
+        self.state.reset_deck()
+        self.recorder.record((engine.RESET, engine.HAND0, engine.DECK, 0))
+
+        # Move the cards put into the deck to the top of the order
+        for key in deck[old_size:]:
+            self.raise_card(key)
+
+        # Move the cards to the deck
+        self.layout(engine.DECK, *engine.HANDS)
+        self.restart_hint()
 
     def check_pile(self, x: int, y: int) -> Optional[str]:
         """ Check which pile the position is in"""
-        for key in self.valid_pos:
+        # Only check the spots in the same column as the position
+        for key in self.pile_index.at(x, y):
             if "TABLE" in key:
                 # Get the height based on number of cards in this pile
                 check_height = c.CARD_HEIGHT + 15 * len(self.valid_pos[key][2])
@@ -686,153 +1000,85 @@ class Game:
         return None
 
     def get_pressed(self, mouse_x, mouse_y) -> Optional[Tuple[int, str]]:
-        """Get the pressed card"""
-        for index, key in reversed(list(enumerate(self.card_order))):
-            # Find and return the card clicked, closest to the top of the list
+        """Get the pressed card, after how high it is in the card_order"""
+        # Only check the cards near the mouse, closest to the top first
+        for key in reversed(self.card_index.at(mouse_x, mouse_y)):
+            # Find and return the card clicked
             if self.cards[key].picked(mouse_x, mouse_y):
-                return index, key
+                return self.card_order.stamp(key), key
         # Return None if no card was clicked
         return None
 
     def will_table_take(self, table: str) -> bool:
         """ Check if the card fits the pattern of the table """
-        # Get the suit and rank of the held_card
-        held_suit = self.cards[self.held_card].get_suit()
-        held_rank = self.cards[self.held_card].get_rank()
-
-        # Check if there are other cards in the spot already
-        if len(self.valid_pos[table][2]) == 0:
-            # Check if the card is a king
-            if held_rank == c.RANKS[12]:
-                # Only a king can be placed in an empty table spot
-                return True
-            return False
-
-        # Get the key of, suit and rank of the bottom card in this table spot
-        bot_key = self.valid_pos[table][2][-1]
-        bot_suit = self.cards[bot_key].get_suit()
-        bot_rank = self.cards[bot_key].get_rank()
-
-        # Check if the ranks match the pattern
-        if c.RANKS.index(held_rank) != c.RANKS.index(bot_rank) - 1:
-            return False
-        # Check if the suits match the pattern
-        if held_suit == c.SUITS[0] or held_suit == c.SUITS[1]:
-            if bot_suit == c.SUITS[2] or bot_suit == c.SUITS[3]:
-                return True
-            return False
-        elif held_suit == c.SUITS[2] or held_suit == c.SUITS[3]:
-            if bot_suit == c.SUITS[0] or bot_suit == c.SUITS[1]:
-                return True
-            return False
+        return self.state.will_table_take(
+            engine.IDS[self.held_card], engine.PILE_NUMBERS[table])
 
     def will_ace_take(self, ace: str) -> bool:
         """ Check if the card fits the final piles pattern"""
-        # Get the suit and rank of the held_card
-        held_suit = self.cards[self.held_card].get_suit()
-        held_rank = self.cards[self.held_card].get_rank()
-
-        # Check if this spot is empty
-        if len(self.valid_pos[ace][2]) == 0:
-            # Check if the card is an Ace
-            if held_rank == c.RANKS[0]:
-                # Only an ace can be placed in an empty final pile
-                return True
-            return False
-
-        # Get the key of, suit and rank of the bottom card in this table spot
-        bot_key = self.valid_pos[ace][2][-1]
-        bot_suit = self.cards[bot_key].get_suit()
-        bot_rank = self.cards[bot_key].get_rank()
-
-        # Check if the card matches the pattern of this spot
-        if c.RANKS.index(held_rank) == \
-                c.RANKS.index(bot_rank) + 1 and held_suit == bot_suit:
-            return True
-        return False
+        return self.state.will_ace_take(
+            engine.IDS[self.held_card], engine.PILE_NUMBERS[ace])
 
     def move_to_hand(self, key: str) -> None:
         """ Move the card from the deck to the hand"""
-        # No card in the furthest spot
-        if len(self.valid_pos["HAND0"][2]) == 0:
-            # Move the card to the furthest hand
-            self.valid_pos["DECK"][2].remove(key)
-            self.valid_pos["HAND0"][2].append(key)
-            self.cards[key].set_x(self.valid_pos["HAND0"][0])
-            self.cards[key].set_y(self.valid_pos["HAND0"][1])
-            # Make the card in play
-            self.make_in_play(self.valid_pos["HAND0"][2][-1])
-            # If there is still a card in the deck, make it clickable
-            if len(self.valid_pos["DECK"][2]) > 0:
-                self.cards[self.valid_pos["DECK"][2][-1]].set_locked(False)
-
-        # No card in the middle spot
-        elif len(self.valid_pos["HAND1"][2]) == 0:
-            # Move the card to the middle hand
-            self.valid_pos["DECK"][2].remove(key)
-            self.valid_pos["HAND1"][2].append(key)
-            self.cards[key].set_x(self.valid_pos["HAND1"][0])
-            self.cards[key].set_y(self.valid_pos["HAND1"][1])
-            # Make the card in play
-            self.make_in_play(self.valid_pos["HAND1"][2][-1])
-            # Make the next card in the deck clickable
-            # If there is still a card in the deck, make it clickable
-            if len(self.valid_pos["DECK"][2]) > 0:
-                self.cards[self.valid_pos["DECK"][2][-1]].set_locked(False)
-            # Lock the card in the furthest hand
-            self.cards[self.valid_pos["HAND0"][2][0]].set_locked(True)
-
-        # No card in the closest spot
-        elif len(self.valid_pos["HAND2"][2]) == 0:
-            # Move the card to the closest hand
-            self.valid_pos["DECK"][2].remove(key)
-            self.valid_pos["HAND2"][2].append(key)
-            self.cards[key].set_x(self.valid_pos["HAND2"][0])
-            self.cards[key].set_y(self.valid_pos["HAND2"][1])
-            # Make the card in play
-            self.make_in_play(self.valid_pos["HAND2"][2][-1])
-            # Make the next card in the deck clickable
-            # If there is still a card in the deck, make it clickable
-            if len(self.valid_pos["DECK"][2]) > 0:
-                self.cards[self.valid_pos["DECK"][2][-1]].set_locked(False)
-            # Lock the card in the middle hand
-            self.cards[self.valid_pos["HAND1"][2][0]].set_locked(True)
-
-        # All hands have cards, move the cards away from the deck
-        else:
-            # Move the card from the middle to the furthest
-            to_move = self.valid_pos["HAND1"][2][-1]
-            self.cards[to_move].set_x(self.valid_pos["HAND0"][0])
-            self.cards[to_move].set_y(self.valid_pos["HAND0"][1])
-            self.valid_pos["HAND1"][2].remove(to_move)
-            self.valid_pos["HAND0"][2].append(to_move)
-
-            # Move the card from the closest to the middle and lock it
-            to_move = self.valid_pos["HAND2"][2][-1]
-            self.cards[to_move].set_locked(True)
-            self.cards[to_move].set_x(self.valid_pos["HAND1"][0])
-            self.cards[to_move].set_y(self.valid_pos["HAND1"][1])
-            self.valid_pos["HAND2"][2].remove(to_move)
-            self.valid_pos["HAND1"][2].append(to_move)
-
-            # Move the top card from the deck to the closest hand
-            self.valid_pos["DECK"][2].remove(key)
-            self.valid_pos["HAND2"][2].append(key)
-            self.cards[key].set_x(self.valid_pos["HAND2"][0])
-            self.cards[key].set_y(self.valid_pos["HAND2"][1])
-            # Make the card in play
-            self.make_in_play(self.valid_pos["HAND2"][2][-1])
-            # If there is still a card in the deck, make it clickable
-            if len(self.valid_pos["DECK"][2]) > 0:
-                self.cards[self.valid_pos["DECK"][2][-1]].set_locked(False)
+        self.state.move_to_hand(engine.IDS[key])
+        self.recorder.record((engine.DRAW, engine.DECK, engine.HAND0, 1))
+        self.layout(engine.DECK, *engine.HANDS)
+        self.restart_hint()
 
     def undo(self) -> None:
         """ Method to go back to the last game state """
-        if len(self.last) != 0:
-            last_state = self.last.pop()
-            self.cards = last_state['cards']
-            self.card_order = last_state['card_order']
-            self.valid_pos = last_state['valid_pos']
+        piles = self.state.undo()
+        if len(piles) != 0:
+            self.recorder.record_undo()
+        # Put the cards of the changed piles back on top, in pile order
+        for pile in piles:
+            for key in self.valid_pos[engine.PILES[pile]][2]:
+                self.raise_card(key)
+        self.layout(*piles)
+        self.restart_hint()
+
+    def start_hint(self) -> None:
+        """ Start searching for the best move from the current position """
+        self.hint = hints.HintSearch(
+            self.state, on_update=lambda: pygame.event.post(
+                pygame.event.Event(HINT_EVENT)))
+        self.hint.start()
+
+    def stop_hint(self) -> None:
+        """ Cancel the hint search and stop showing the hint """
+        if self.hint is not None:
+            self.hint.cancel()
+            self.hint = None
+        self.show_hint()
+
+    def restart_hint(self) -> None:
+        """ Search again after a move, if hints are being shown """
+        if self.hint is not None:
+            self.hint.cancel()
+            self.start_hint()
+            self.show_hint()
+
+    def show_hint(self) -> None:
+        """ Outline the best move found so far, drawing the old one away """
+        for rect in self.hint_rects:
+            self.dirty.add(rect.inflate(2, 2))
+        self.hint_rects = []
+        if self.hint is None or self.hint.best is None:
+            return
+
+        kind, src, dst, count = self.hint.best
+        if kind != engine.PLACE:
+            # Click the deck to draw a card or put the hand back
+            src, dst = engine.DECK, engine.DECK
+        for pile, depth in ((src, count), (dst, 0)):
+            # Outline the card moved, or the card moved onto
+            size = len(self.valid_pos[engine.PILES[pile]][2])
+            x, y = self.spot(pile, max(size - max(depth, 1), 0))
+            self.hint_rects.append(pygame.Rect(
+                x - 1, y - 1, c.CARD_WIDTH + 2, c.CARD_HEIGHT + 2))
+        for rect in self.hint_rects:
+            self.dirty.add(rect.inflate(2, 2))
 
     @staticmethod
     def check_in_box(
@@ -852,5 +1098,5 @@ class Game:
 
 
 if __name__ == "__main__":
-    game = Game()
+    game = Game(animate=True)
     game.menu()
@@ -0,0 +1,178 @@
+"""Suggesting the next move in the background, without pygame"""
+import threading
+import time
+import constants as c
+import engine
+import solver
+from typing import Callable, Dict, List, Optional
+
+# Value of a won position, above any position not won
+WIN = 1 << 20
+# Positions searched between letting the game's thread run
+YIELD_NODES = 16
+
+
+def evaluate(state: engine.GameState) -> int:
+    """ Rate a position, higher is closer to a win """
+    if state.is_won():
+        return WIN
+    return state.founded * 10 - state.hidden * 5
+
+
+class HintSearch:
+    """
+    Anytime search for the best next move from a position, run on a thread
+    of its own so the game keeps drawing frames while it thinks
+
+    The search looks one move further ahead each round until it finds a
+    win, runs out of time or is cancelled, and best always holds the first
+    move of the best line found so far
+
+    ===Attributes===
+    state:
+        engine.GameState copy of the position to search from
+    budget:
+        float most seconds to search for
+    on_update:
+        function called from the search thread whenever best changes and
+        once the search stops, or None
+    best:
+        engine.Move to make next, or None until one is found
+    value:
+        int rating of the position best leads to
+    depth:
+        int number of moves ahead of the last finished round
+    nodes:
+        int number of positions searched
+    finished:
+        bool of whether the search has stopped
+    cancelled:
+        threading.Event set to stop the search early
+    thread:
+        threading.Thread running the search, or None if not started
+    """
+    state: engine.GameState
+    budget: float
+    on_update: Optional[Callable[[], None]]
+    best: Optional[engine.Move]
+    value: int
+    depth: int
+    nodes: int
+    finished: bool
+    cancelled: threading.Event
+    thread: Optional[threading.Thread]
+
+    def __init__(self, state: engine.GameState,
+                 budget: float = c.HINT_SECONDS,
+                 on_update: Optional[Callable[[], None]] = None) -> None:
+        """ Initialize a search from state, which is not changed """
+        self.state = state.copy()
+        self.state.undo_limit = None
+        self.budget = budget
+        self.on_update = on_update
+        self.best = None
+        self.value = -WIN
+        self.depth = 0
+        self.nodes = 0
+        self.finished = False
+        self.cancelled = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        """ Start searching on a background thread """
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def cancel(self) -> None:
+        """ Stop the search as soon as it next checks, without waiting """
+        self.cancelled.set()
+
+    def run(self) -> None:
+        """ Search until a win is found, the time is up or it is cancelled """
+        deadline = time.perf_counter() + self.budget
+        moves = solver.ordered_moves(self.state)
+        # Most promising first, ordered_moves puts it last
+        moves.reverse()
+        depth = 1
+        while len(moves) != 0 and self.value < WIN and \
+                depth <= len(engine.PILES) * 4:
+            seen = {}
+            values = {}
+            for move in moves:
+                self.state.apply(move)
+                values[move] = self.search(depth - 1, deadline, seen)
+                self.state.undo()
+                if values[move] > self.value:
+                    self.set_best(move, values[move])
+                if self.stopped(deadline):
+                    break
+            if self.stopped(deadline):
+                break
+            self.depth = depth
+            # Look at the best moves of this round first in the next one
+            moves.sort(key=lambda m: -values[m])
+            depth += 1
+        self.finished = True
+        if self.on_update is not None:
+            self.on_update()
+
+    def search(self, depth: int, deadline: float,
+               seen: Dict[int, int]) -> int:
+        """
+        Get the best rating of the positions up to depth moves from state,
+        skipping positions already searched as deep this round
+        """
+        self.nodes += 1
+        if self.nodes % YIELD_NODES == 0:
+            # Let the game's thread take its turn
+            time.sleep(0)
+        value = evaluate(self.state)
+        if depth == 0 or value == WIN or self.stopped(deadline):
+            return value
+        key = self.state.zobrist()
+        if seen.get(key, -1) >= depth:
+            return value
+        seen[key] = depth
+
+        for move in self.ordered():
+            self.state.apply(move)
+            value = max(value, self.search(depth - 1, deadline, seen))
+            self.state.undo()
+            if value == WIN:
+                break
+        return value
+
+    def ordered(self) -> List[engine.Move]:
+        """ Get the moves to try from state, most promising first """
+        moves = solver.ordered_moves(self.state)
+        moves.reverse()
+        return moves
+
+    def stopped(self, deadline: float) -> bool:
+        """ Check if the search should stop """
+        return self.cancelled.is_set() or time.perf_counter() > deadline
+
+    def set_best(self, move: engine.Move, value: int) -> None:
+        """ Keep the move as the best found so far """
+        self.best = move
+        self.value = value
+        if self.on_update is not None:
+            self.on_update()
+
+
+if __name__ == "__main__":
+    # python hints.py [deal number] [seconds]
+    # Search a deal for a hint and show how the search went
+    import sys
+    import deals
+
+    position = engine.GameState()
+    position.deal(deals.deal_order(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1))
+    hint = HintSearch(position, float(sys.argv[2]) if len(sys.argv) > 2
+                      else c.HINT_SECONDS)
+    begin = time.perf_counter()
+    hint.run()
+    print("best {}, value {}, depth {}, {} nodes in {:.2f} s".format(
+        hint.best, hint.value, hint.depth, hint.nodes,
+        time.perf_counter() - begin))
@@ -0,0 +1,114 @@
+"""Timing of each phase of a frame, kept over the last few frames"""
+import json
+import time
+import constants as c
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame and keeps the times of the last frames,
+    to find which phase makes a frame slow
+
+    A frame is timed by calling begin, then lap after each phase with the
+    name of the phase, then end
+
+    ===Attributes===
+    phases:
+        list of str names of the phases in a frame, in order
+    history:
+        dict of each phase, and "frame" for the whole frame, pointing to
+        the seconds it took in each of the last frames
+    current:
+        dict of each phase pointing to the seconds it took so far this frame
+    hitches:
+        deque of the frame number, seconds and phase times of the last
+        frames slower than c.HITCH_SECONDS
+    frames:
+        int number of frames timed
+    started:
+        float time the current frame started
+    last:
+        float time the last phase ended
+    """
+    phases: List[str]
+    history: Dict[str, Deque[float]]
+    current: Dict[str, float]
+    hitches: Deque[Tuple[int, float, Dict[str, float]]]
+    frames: int
+    started: float
+    last: float
+
+    def __init__(self, phases: List[str],
+                 window: int = c.PROFILE_WINDOW) -> None:
+        """ Initialize a profiler keeping the last window frames """
+        self.phases = phases
+        self.history = {name: deque(maxlen=window)
+                        for name in phases + ["frame"]}
+        self.current = dict.fromkeys(phases, 0.0)
+        self.hitches = deque(maxlen=20)
+        self.frames = 0
+        self.started = time.perf_counter()
+        self.last = self.started
+
+    def begin(self) -> None:
+        """ Start timing a frame """
+        self.started = time.perf_counter()
+        self.last = self.started
+        for name in self.phases:
+            self.current[name] = 0.0
+
+    def lap(self, phase: str) -> None:
+        """ Add the time since the last phase ended to phase """
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end(self) -> None:
+        """ Finish timing the frame and keep its times """
+        total = self.last - self.started
+        for name in self.phases:
+            self.history[name].append(self.current[name])
+        self.history["frame"].append(total)
+        self.frames += 1
+        if total > c.HITCH_SECONDS:
+            self.hitches.append((self.frames, total, dict(self.current)))
+
+    def percentile(self, name: str, percent: float) -> float:
+        """ Get the seconds that percent of the last frames took for name """
+        values = sorted(self.history[name])
+        if len(values) == 0:
+            return 0.0
+        return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """ Get the p50, p95, p99 and max milliseconds of every phase """
+        return {name: {"p50": self.percentile(name, 50) * 1000,
+                       "p95": self.percentile(name, 95) * 1000,
+                       "p99": self.percentile(name, 99) * 1000,
+                       "max": self.percentile(name, 100) * 1000}
+                for name in self.history}
+
+    def overlay_lines(self) -> List[str]:
+        """ Get the lines of text to show over the game """
+        summary = self.summary()
+        frame = summary["frame"]
+        # The phases slowest at p95 first
+        worst = sorted(self.phases, key=lambda name: -summary[name]["p95"])
+        return ["frame ms p50 {:.1f} p95 {:.1f} p99 {:.1f} max {:.1f}".format(
+                    frame["p50"], frame["p95"], frame["p99"], frame["max"]),
+                "p95 " + " ".join("{} {:.1f}".format(
+                    name, summary[name]["p95"]) for name in worst)]
+
+    def dump(self, path: str) -> None:
+        """ Write the summary and the last hitches to a json file at path """
+        with open(path, "w") as file:
+            json.dump({
+                "frames": self.frames,
+                "phases": self.summary(),
+                "hitches": [{"frame": frame, "ms": seconds * 1000,
+                             "phases": {name: value * 1000
+                                        for name, value in phases.items()}}
+                            for frame, seconds, phases in self.hitches]
+            }, file, indent=2)
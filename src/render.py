@@ -0,0 +1,175 @@
+"""Helpers for drawing the game to the screen"""
+import pygame
+import card
+import constants as c
+import sprites
+from typing import Dict, Iterable, List, Tuple
+
+
+class DirtyTracker:
+    """
+    Keeps track of which parts of the screen changed since the last frame
+
+    ===Attributes===
+    drawn:
+        dict of str card keys pointing to the x, y and visible state the
+        card had when it was last drawn
+    order:
+        list of str card keys in the order they were last drawn
+    full:
+        bool of whether the whole screen needs to be drawn next frame
+    pending:
+        list of pygame.Rect parts of the screen marked to be drawn next
+        frame that no card changed in
+    """
+    drawn: Dict[str, Tuple[int, int, bool]]
+    order: List[str]
+    full: bool
+    pending: List[pygame.Rect]
+
+    def __init__(self) -> None:
+        """ Initialize a tracker that draws everything on the first frame """
+        self.drawn = {}
+        self.order = []
+        self.full = True
+        self.pending = []
+
+    def invalidate(self) -> None:
+        """ Mark the whole screen to be drawn on the next frame """
+        self.full = True
+
+    def add(self, rect: pygame.Rect) -> None:
+        """ Mark a part of the screen to be drawn on the next frame """
+        self.pending.append(rect)
+
+    def find_dirty(self, cards: Dict[str, card.Card],
+                   card_order: Iterable[str]) -> List[pygame.Rect]:
+        """
+        Get the parts of the screen that need drawing again, and remember
+        the cards as drawn
+        """
+        rects = self.pending
+        self.pending = []
+        order = list(card_order)
+        # Cards that moved or flipped need their old and new spot drawn
+        for key in order:
+            now = (cards[key].get_x(), cards[key].get_y(),
+                   cards[key].get_visible())
+            old = self.drawn.get(key)
+            if old != now:
+                if old is not None:
+                    rects.append(pygame.Rect(
+                        old[0], old[1], c.CARD_WIDTH, c.CARD_HEIGHT))
+                rects.append(pygame.Rect(
+                    now[0], now[1], c.CARD_WIDTH, c.CARD_HEIGHT))
+                self.drawn[key] = now
+
+        # Cards that changed places in the order need drawing again
+        if order != self.order:
+            same = 0
+            while same < min(len(order), len(self.order)) and \
+                    order[same] == self.order[same]:
+                same += 1
+            for key in order[same:]:
+                rects.append(pygame.Rect(
+                    cards[key].get_x(), cards[key].get_y(),
+                    c.CARD_WIDTH, c.CARD_HEIGHT))
+            self.order = order
+
+        if self.full:
+            self.full = False
+            return [pygame.Rect(0, 0, c.SCREEN_WIDTH, c.SCREEN_HEIGHT)]
+        return merge_rects(rects)
+
+
+def merge_rects(rects: List[pygame.Rect]) -> List[pygame.Rect]:
+    """ Join rectangles that overlap so no part is drawn twice """
+    merged = []
+    for rect in rects:
+        # Keep joining with overlapping rectangles until none are left
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+def cards_in(rect: pygame.Rect, cards: Dict[str, card.Card],
+             card_order: Iterable[str]) -> List[str]:
+    """ Get the keys of the cards touching rect, in draw order """
+    return [key for key in card_order if rect.colliderect(
+        cards[key].get_x(), cards[key].get_y(), c.CARD_WIDTH, c.CARD_HEIGHT)]
+
+
+def table_layer(undo: pygame.Surface) -> pygame.Surface:
+    """
+    Draw the parts of the game under the cards that never change, the
+    background, the border of each spot but the hand and the undo button
+    """
+    layer = pygame.Surface((c.SCREEN_WIDTH, c.SCREEN_HEIGHT))
+    layer.fill(c.BACK_COLOUR)
+    for key, (x, y) in c.PILE_SPOTS.items():
+        if "HAND" not in key:
+            pygame.draw.rect(layer, (255, 255, 255), pygame.Rect(
+                x, y, c.CARD_WIDTH, c.CARD_HEIGHT), 1)
+    layer.blit(undo, (c.SCREEN_WIDTH - 75, c.SCREEN_HEIGHT - 75))
+    if pygame.display.get_surface() is not None:
+        layer = layer.convert()
+    return layer
+
+
+class BackRuns:
+    """
+    Drawings of runs of face down cards spread down a table, made the first
+    time each length is needed and kept, as every face down card looks the
+    same
+
+    ===Attributes===
+    images:
+        sprites.CardSprites holding the back of the cards
+    runs:
+        dict of the number of cards in a run pointing to its drawing
+    """
+    images: sprites.CardSprites
+    runs: Dict[int, pygame.Surface]
+
+    def __init__(self, images: sprites.CardSprites) -> None:
+        """ Initialize with no runs drawn """
+        self.images = images
+        self.runs = {}
+
+    def get(self, count: int) -> pygame.Surface:
+        """ Get the drawing of a run of count face down cards """
+        if count not in self.runs:
+            run = run_surface(self.images, count)
+            for index in range(count):
+                run.blit(self.images.back, (0, 15 * index))
+            self.runs[count] = run
+        return self.runs[count]
+
+
+def run_surface(images: sprites.CardSprites, count: int) -> pygame.Surface:
+    """
+    Get an empty surface for count cards spread down like on the table,
+    see-through where the card sprites are
+    """
+    run = pygame.Surface((c.CARD_WIDTH, c.CARD_HEIGHT + 15 * (count - 1)),
+                         images.back.get_flags() & pygame.SRCALPHA)
+    # Keep the see-through corners of the cards, the same way the sprite
+    # sheet marks them
+    key = images.back.get_colorkey()
+    if key is not None:
+        run.fill(key)
+        run.set_colorkey(key)
+    return run
+
+
+def stack_layer(images: sprites.CardSprites,
+                cards: List[card.Card]) -> pygame.Surface:
+    """ Draw the cards spread down like on the table onto one surface """
+    layer = run_surface(images, len(cards))
+    for index, shown in enumerate(cards):
+        layer.blit(images.faces[shown.number] if shown.get_visible()
+                   else images.back, (0, 15 * index))
+    return layer
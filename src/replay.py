@@ -0,0 +1,101 @@
+"""Compact recordings of games, and playing them back without pygame"""
+import constants as c
+import deals
+import engine
+from typing import List, Tuple
+
+# Start of every recording, followed by the version
+MAGIC = b"SOLR"
+VERSION = 1
+# Bytes before the first move, the magic, version and deal number
+HEADER_SIZE = len(MAGIC) + 1 + 8
+# Kind of move for taking back the last move, after the kinds in engine
+UNDO = 3
+
+
+def pack_move(kind: int, src: int, dst: int, count: int) -> bytes:
+    """
+    Pack a move into 2 bytes, 2 bits for the kind, 4 bits for each pile
+    and 5 bits for the number of cards
+    """
+    value = kind << 13 | src << 9 | dst << 5 | count
+    return value.to_bytes(2, "little")
+
+
+def unpack_move(data: bytes, offset: int) -> Tuple[int, int, int, int]:
+    """ Get the move packed at offset in data """
+    value = data[offset] | data[offset + 1] << 8
+    return value >> 13, value >> 9 & 15, value >> 5 & 15, value & 31
+
+
+class Recorder:
+    """
+    Records the moves of a game as they are made
+
+    ===Attributes===
+    deal_number:
+        int number of the deal the game started from
+    moves:
+        bytearray of the moves made, 2 bytes each
+    """
+    deal_number: int
+    moves: bytearray
+
+    def __init__(self, deal_number: int) -> None:
+        """ Initialize a recording of deal_number with no moves """
+        self.deal_number = deal_number
+        self.moves = bytearray()
+
+    def record(self, move: engine.Move) -> None:
+        """ Add a move made to the recording """
+        self.moves += pack_move(*move)
+
+    def record_undo(self) -> None:
+        """ Add taking back the last move to the recording """
+        self.moves += pack_move(UNDO, 0, 0, 0)
+
+    def data(self) -> bytes:
+        """ Get the recording as bytes, to store or play back """
+        return MAGIC + bytes([VERSION]) + \
+            self.deal_number.to_bytes(8, "little") + bytes(self.moves)
+
+
+def read(data: bytes) -> Tuple[int, List[Tuple[int, int, int, int]]]:
+    """ Get the deal number and the moves of a recording """
+    if data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != VERSION:
+        raise ValueError("Not a recording of a game")
+    deal_number = int.from_bytes(data[len(MAGIC) + 1:HEADER_SIZE], "little")
+    return deal_number, [unpack_move(data, offset)
+                         for offset in range(HEADER_SIZE, len(data), 2)]
+
+
+def replay(data: bytes) -> engine.GameState:
+    """
+    Play a recording back as fast as possible, without drawing anything
+    Returns the state the game was left in
+    """
+    deal_number, moves = read(data)
+    state = engine.GameState(c.UNDO_LIMIT)
+    state.deal(deals.deal_order(deal_number))
+    for move in moves:
+        if move[0] == UNDO:
+            state.undo()
+        else:
+            state.apply(move)
+    return state
+
+
+if __name__ == "__main__":
+    # python replay.py recording
+    # Time playing the recording back and show how the game ended
+    import sys
+    import timeit
+
+    with open(sys.argv[1], "rb") as file:
+        recording = file.read()
+    end = replay(recording)
+    seconds = min(timeit.repeat(lambda: replay(recording), number=100,
+                                repeat=5)) / 100
+    print("deal {}, {} moves, {} in {:.0f} us".format(
+        read(recording)[0], (len(recording) - HEADER_SIZE) // 2,
+        "won" if end.is_won() else "not won", seconds * 1e6))
@@ -0,0 +1,292 @@
+"""Hosting many games at once over a socket, without pygame"""
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+import constants as c
+import deals
+import engine
+from typing import Dict, List, Optional
+
+# Address the server listens on unless told otherwise
+HOST = "127.0.0.1"
+PORT = 7452
+# Most bytes a request line may take, longer lines close the connection
+LINE_LIMIT = 1024
+
+
+class Session:
+    """
+    One game being played by a connection to the server
+
+    ===Attributes===
+    deal_number:
+        int number of the deal being played
+    state:
+        engine.GameState of the game, with the moves to undo
+    """
+    deal_number: int
+    state: engine.GameState
+
+    def __init__(self) -> None:
+        """ Initialize a session with no cards dealt """
+        self.deal_number = 0
+        self.state = engine.GameState(c.UNDO_LIMIT)
+
+    def deal(self, deal_number: Optional[int] = None) -> None:
+        """ Deal deal_number, or a random deal if None """
+        if deal_number is None:
+            deal_number = deals.random_deal_number()
+        self.deal_number = deal_number
+        self.state.deal(deals.deal_order(deal_number))
+
+    def handle(self, line: str) -> str:
+        """
+        Carry out one request and get the reply, both a line of text
+        Requests are
+            DEAL [number]             deal a new game
+            MOVE kind src dst count   make a move, the same as engine.Move
+            UNDO                      take back the last move
+            STATE                     get the game as hex of GameState.pack
+        Replies start with OK, or ERR and the reason
+        """
+        words = line.split()
+        if len(words) == 0:
+            return "ERR empty request"
+        command = words[0].upper()
+        try:
+            numbers = [int(word) for word in words[1:]]
+        except ValueError:
+            return "ERR bad number"
+
+        if command == "DEAL" and len(numbers) <= 1:
+            if len(numbers) == 1 and not 0 <= numbers[0] < deals.DEAL_COUNT:
+                return "ERR bad deal number"
+            self.deal(numbers[0] if len(numbers) == 1 else None)
+            return "OK {}".format(self.deal_number)
+        if command == "MOVE" and len(numbers) == 4:
+            move = (numbers[0], numbers[1], numbers[2], numbers[3])
+            if move not in self.state.legal_moves():
+                return "ERR illegal move"
+            self.state.apply(move)
+            return "OK WON" if self.state.is_won() else "OK"
+        if command == "UNDO" and len(numbers) == 0:
+            piles = self.state.undo()
+            if len(piles) == 0:
+                return "ERR nothing to undo"
+            return "OK " + " ".join(str(pile) for pile in piles)
+        if command == "STATE" and len(numbers) == 0:
+            return "OK {} {}".format(self.deal_number,
+                                     self.state.pack().hex())
+        return "ERR unknown request"
+
+
+class Server:
+    """
+    Serves a session to each connection, all on one event loop
+
+    ===Attributes===
+    sessions:
+        dict of the number of each open connection pointing to its session
+    opened:
+        int number of connections made since the server started
+    """
+    sessions: Dict[int, Session]
+    opened: int
+
+    def __init__(self) -> None:
+        """ Initialize a server with no connections """
+        self.sessions = {}
+        self.opened = 0
+
+    async def serve(self, reader: asyncio.StreamReader,
+                    writer: asyncio.StreamWriter) -> None:
+        """ Answer the requests of one connection until it closes """
+        number = self.opened
+        self.opened += 1
+        session = Session()
+        session.deal()
+        self.sessions[number] = session
+        try:
+            while True:
+                try:
+                    line = (await reader.readline()).decode()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Not text or too long, nothing after it can be trusted
+                    writer.write(b"ERR bad line\n")
+                    await writer.drain()
+                    break
+                if len(line) == 0:
+                    break
+                writer.write(session.handle(line).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[number]
+            writer.close()
+
+    async def start(self, host: str = HOST,
+                    port: int = PORT) -> asyncio.AbstractServer:
+        """ Start listening, port 0 picks any free port """
+        return await asyncio.start_server(self.serve, host, port,
+                                          limit=LINE_LIMIT)
+
+
+class Client:
+    """
+    Connection to a server, keeping a copy of the game to pick moves from
+
+    ===Attributes===
+    reader:
+        asyncio.StreamReader of the replies
+    writer:
+        asyncio.StreamWriter of the requests
+    state:
+        engine.GameState copy of the game on the server
+    """
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    state: engine.GameState
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter) -> None:
+        """ Initialize a client on an open connection """
+        self.reader = reader
+        self.writer = writer
+        self.state = engine.GameState(c.UNDO_LIMIT)
+
+    @staticmethod
+    async def connect(host: str = HOST, port: int = PORT) -> 'Client':
+        """ Open a connection to the server """
+        reader, writer = await asyncio.open_connection(host, port)
+        return Client(reader, writer)
+
+    async def request(self, line: str) -> str:
+        """ Send a request and wait for the reply """
+        self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+        return (await self.reader.readline()).decode().rstrip("\n")
+
+    async def deal(self, deal_number: int) -> str:
+        """ Deal a game on the server and the same game here """
+        reply = await self.request("DEAL {}".format(deal_number))
+        self.state.deal(deals.deal_order(deal_number))
+        return reply
+
+    async def move(self, move: engine.Move) -> str:
+        """ Make a move on the server, and here if it was legal """
+        reply = await self.request("MOVE {} {} {} {}".format(*move))
+        if reply.startswith("OK"):
+            self.state.apply(move)
+        return reply
+
+    async def undo(self) -> str:
+        """ Take back the last move on the server and here """
+        reply = await self.request("UNDO")
+        if reply.startswith("OK"):
+            self.state.undo()
+        return reply
+
+    async def close(self) -> None:
+        """ Close the connection """
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def play(host: str, port: int, seed: int, moves: int,
+               latencies: List[float]) -> None:
+    """
+    Connect and play moves random moves, adding the seconds each move
+    took to latencies
+    """
+    rng = random.Random(seed)
+    client = await Client.connect(host, port)
+    await client.deal(seed)
+    for _ in range(moves):
+        legal = client.state.legal_moves()
+        start = time.perf_counter()
+        # Undo now and then, and when there is nothing else to do
+        if len(legal) == 0 or rng.random() < 0.1:
+            await client.undo()
+        else:
+            await client.move(rng.choice(legal))
+        latencies.append(time.perf_counter() - start)
+    await client.close()
+
+
+async def load(sessions: int, moves: int, host: Optional[str] = None,
+               port: int = PORT) -> Dict[str, float]:
+    """
+    Play sessions games at once against a server, starting one on any free
+    port if no host is given, and get the throughput and latencies
+    """
+    server = None
+    if host is None:
+        server = await Server().start(HOST, 0)
+        host, port = server.sockets[0].getsockname()[:2]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(play(host, port, seed, moves, latencies)
+                           for seed in range(sessions)))
+    seconds = time.perf_counter() - start
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    latencies.sort()
+    return {"sessions": sessions,
+            "requests": len(latencies),
+            "seconds": seconds,
+            "requests_per_second": len(latencies) / seconds,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+            "max_ms": latencies[-1] * 1000}
+
+
+def session_bytes(count: int = 1000, moves: int = 50) -> float:
+    """ Measure the memory each session uses, after moves random moves """
+    rng = random.Random(0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = []
+    for seed in range(count):
+        session = Session()
+        session.deal(seed)
+        for _ in range(moves):
+            legal = session.state.legal_moves()
+            if len(legal) != 0:
+                session.state.apply(rng.choice(legal))
+        sessions.append(session)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count
+
+
+def main(argv: List[str]) -> None:
+    """ Serve games, or run the load generator against a server """
+    if len(argv) > 0 and argv[0] == "load":
+        # load [sessions] [moves] [host] [port]
+        result = asyncio.run(load(
+            int(argv[1]) if len(argv) > 1 else 1000,
+            int(argv[2]) if len(argv) > 2 else 100,
+            argv[3] if len(argv) > 3 else None,
+            int(argv[4]) if len(argv) > 4 else PORT))
+        result["bytes_per_session"] = session_bytes()
+        for name, value in result.items():
+            print("{}: {:.2f}".format(name, value))
+    else:
+        # [port]
+        async def forever() -> None:
+            server = await Server().start(
+                HOST, int(argv[0]) if len(argv) > 0 else PORT)
+            async with server:
+                await server.serve_forever()
+        asyncio.run(forever())
+
+
+if __name__ == "__main__":
+    import sys
+
+    main(sys.argv[1:])
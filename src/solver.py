@@ -0,0 +1,256 @@
+"""Search for a way to win a dealt game, without pygame"""
+import sys
+import time
+import engine
+from typing import Dict, Hashable, List, Optional
+
+
+class TranspositionTable:
+    """
+    Set of the positions already searched, holding at most max_entries
+    Once the newer half fills up, the older half is thrown away, so the
+    positions seen most recently are kept
+
+    ===Attributes===
+    max_entries:
+        int most positions to hold at once
+    new:
+        dict of the positions added since the last time the table filled
+    old:
+        dict of the positions added before the last time the table filled
+    peak_bytes:
+        int most bytes the table has used at once
+    """
+    max_entries: int
+    new: Dict[Hashable, None]
+    old: Dict[Hashable, None]
+    peak_bytes: int
+
+    def __init__(self, max_entries: int) -> None:
+        """ Initialize an empty table """
+        self.max_entries = max_entries
+        self.new = {}
+        self.old = {}
+        self.peak_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.new) + len(self.old)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.new or key in self.old
+
+    def add(self, key: Hashable) -> None:
+        """ Add the position, throwing away the older half if full """
+        self.new[key] = None
+        if len(self.new) >= self.max_entries // 2:
+            # Measure the table at its largest before shrinking it
+            self.peak_bytes = max(self.peak_bytes, self.size_bytes(key))
+            self.old = self.new
+            self.new = {}
+
+    def size_bytes(self, key: Hashable) -> int:
+        """ Estimate the bytes used by the table, with keys the size of key """
+        return sys.getsizeof(self.new) + sys.getsizeof(self.old) + \
+            len(self) * sys.getsizeof(key)
+
+
+class SolveResult:
+    """
+    What the solver found for a game
+
+    ===Attributes===
+    winnable:
+        bool of whether the game can be won, or None if the search ran out
+        of nodes first
+    moves:
+        list of the moves that win the game, empty if not winnable
+    nodes:
+        int number of positions searched
+    seconds:
+        float time taken to search
+    peak_bytes:
+        int most bytes the transposition table used at once
+    """
+    winnable: Optional[bool]
+    moves: List[engine.Move]
+    nodes: int
+    seconds: float
+    peak_bytes: int
+
+    def __init__(self, winnable: Optional[bool], moves: List[engine.Move],
+                 nodes: int, seconds: float, peak_bytes: int) -> None:
+        """ Initialize the result of a search """
+        self.winnable = winnable
+        self.moves = moves
+        self.nodes = nodes
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+
+    def nodes_per_second(self) -> float:
+        """ Get how fast the positions were searched """
+        return self.nodes / max(self.seconds, 1e-9)
+
+
+def safe_to_found(state: engine.GameState, card: int) -> bool:
+    """
+    Check if putting the card on a final pile can never lose the game,
+    because every card that could go on it is already on a final pile
+    """
+    rank = engine.RANK[card]
+    if rank <= 1:
+        return True
+    # The cards one rank lower and of the other colour go on this card,
+    # so both suits of the other colour need rank cards on a final pile
+    done = 0
+    for ace in engine.ACES:
+        pile = state.piles[ace]
+        if len(pile) >= rank and \
+                engine.COLOUR[pile[0]] != engine.COLOUR[card]:
+            done += 1
+    return done == 2
+
+
+def frees_card(state: engine.GameState, src: int, count: int) -> bool:
+    """
+    Check if the card under the top count cards of src could go on a final
+    pile, or take a card from the hand or another table, once uncovered
+    """
+    under = state.piles[src][-count - 1]
+    for ace in engine.ACES:
+        if engine.FOUNDS_ON[under * 53 + state.top(ace)]:
+            return True
+    moving = state.piles[src][-count]
+    for pile in range(engine.HAND0, len(engine.PILES)):
+        if pile == src or pile in engine.ACES:
+            continue
+        for card in reversed(state.piles[pile]):
+            if state.is_locked(card):
+                break
+            # The moving card itself can not be the one to go back
+            if card != moving and engine.STACKS_ON[card * 53 + under]:
+                return True
+    return False
+
+
+def score(state: engine.GameState, move: engine.Move) -> int:
+    """ Rate how promising a move is, higher is tried first """
+    kind, src, dst, count = move
+    if kind == engine.DRAW:
+        return 2
+    if kind == engine.RESET:
+        return 0
+    if dst in engine.ACES:
+        return 6
+    if src in engine.ACES:
+        # Taking a card back off of a final pile is rarely needed
+        return 0
+    if src in engine.HANDS:
+        return 4
+    # A table move that shows a face down card or empties the pile
+    pile = state.piles[src]
+    if count == len(pile) or not state.is_visible(pile[-count - 1]):
+        return 5
+    return 1
+
+
+def ordered_moves(state: engine.GameState) -> List[engine.Move]:
+    """
+    Get the moves worth trying from state, the most promising last
+    A safe move to a final pile is the only move returned when there is one
+    """
+    moves = []
+    for move in engine.legal_moves(state):
+        kind, src, dst, count = move
+        if kind == engine.PLACE:
+            # An ace moving between empty final piles changes nothing
+            if src in engine.ACES and dst in engine.ACES:
+                continue
+            card = state.piles[src][-count]
+            if dst in engine.ACES and safe_to_found(state, card):
+                return [move]
+            # Moving a whole pile onto an empty table changes nothing
+            if count == len(state.piles[src]) and src in engine.TABLES \
+                    and len(state.piles[dst]) == 0:
+                continue
+            # Splitting a face up run between tables only helps if the card
+            # left on top can then go somewhere or take another card
+            if src in engine.TABLES and dst in engine.TABLES and \
+                    count < len(state.piles[src]) and \
+                    state.is_visible(state.piles[src][-count - 1]) and \
+                    not frees_card(state, src, count):
+                continue
+        moves.append(move)
+    moves.sort(key=lambda m: score(state, m))
+    return moves
+
+
+def solve(state: engine.GameState, max_nodes: int = 250000,
+          max_entries: int = 1 << 20) -> SolveResult:
+    """
+    Search depth first for a way to win from state, skipping positions
+    whose hash is in the transposition table
+    state is not changed
+    """
+    start = time.perf_counter()
+    state = state.copy()
+    state.undo_limit = None
+    table = TranspositionTable(max_entries)
+    table.add(state.zobrist())
+    path = []
+    # Moves left to try at each depth of the search
+    stack = [ordered_moves(state)]
+    nodes = 0
+    winnable = False
+
+    while len(stack) != 0:
+        if state.is_won():
+            winnable = True
+            break
+        if nodes >= max_nodes:
+            winnable = None
+            break
+        if len(stack[-1]) == 0:
+            # Nothing left to try here, go back a move
+            stack.pop()
+            if len(path) != 0:
+                path.pop()
+                state.undo()
+            continue
+
+        move = stack[-1].pop()
+        state.apply(move)
+        nodes += 1
+        key = state.zobrist()
+        if key in table:
+            state.undo()
+            continue
+        table.add(key)
+        path.append(move)
+        stack.append(ordered_moves(state))
+
+    return SolveResult(winnable, path if winnable else [], nodes,
+                       time.perf_counter() - start,
+                       max(table.peak_bytes, table.size_bytes(0)))
+
+
+def solve_deal(order: List[int], max_nodes: int = 250000,
+               max_entries: int = 1 << 20) -> SolveResult:
+    """ Deal the cards in order, like Game.place_cards, and solve it """
+    state = engine.GameState()
+    state.deal(order)
+    return solve(state, max_nodes, max_entries)
+
+
+if __name__ == "__main__":
+    # Solve a few random deals and show how the search went
+    import random
+
+    for _ in range(int(sys.argv[1]) if len(sys.argv) > 1 else 5):
+        deal = list(range(52))
+        random.shuffle(deal)
+        result = solve_deal(deal)
+        print("winnable: {}, moves: {}, nodes: {}, {:.0f} nodes/s, "
+              "{:.2f} s, {:.1f} MB".format(
+                  result.winnable, len(result.moves), result.nodes,
+                  result.nodes_per_second(), result.seconds,
+                  result.peak_bytes / 1e6))
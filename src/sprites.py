@@ -0,0 +1,39 @@
+"""Sprites cut out of the sprite sheets ahead of time, ready to draw"""
+import pygame
+import constants as c
+from typing import List
+
+
+class CardSprites:
+    """
+    A sprite for every card face and one for the card back, cut from the
+    sprite sheet once and converted to the pixel format of the display
+
+    ===Attributes===
+    faces:
+        list of pygame.Surface for each card face, in the order of
+        suit * 13 + rank using the order in constants
+    back:
+        pygame.Surface of the back of a card
+    """
+    faces: List[pygame.Surface]
+    back: pygame.Surface
+
+    def __init__(self, sheet: pygame.Surface) -> None:
+        """
+        Cut the sprites out of sheet
+
+        Without a display, as when drawing off-screen, the sheet keeps
+        its own pixel format
+        """
+        if pygame.display.get_surface() is not None:
+            sheet = sheet.convert()
+        self.faces = []
+        for i in range(4):
+            for j in range(13):
+                self.faces.append(sheet.subsurface(pygame.Rect(
+                    j * c.CARD_WIDTH, i * c.CARD_HEIGHT,
+                    c.CARD_WIDTH, c.CARD_HEIGHT)).copy())
+        self.back = sheet.subsurface(pygame.Rect(
+            c.CARD_BACK_X, c.CARD_BACK_Y,
+            c.CARD_WIDTH, c.CARD_HEIGHT)).copy()
@@ -0,0 +1,140 @@
+"""Drawing game states off-screen, to surfaces and png files"""
+import multiprocessing
+import os
+import pygame
+import card
+import constants as c
+import deals
+import engine
+import sprites
+from typing import Dict, List, Optional, Tuple
+
+# Sprite sheet of the cards, found from this file so any folder works
+SHEET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "sprites", "cards.png")
+
+
+class BoardRenderer:
+    """
+    Draws game states the way Game draws them, onto surfaces of their own
+    so no window is needed
+
+    ===Attributes===
+    images:
+        sprites.CardSprites to draw the cards with
+    cards:
+        list of card.Card for each card number, moved to where each state
+        has it before being drawn
+    """
+    images: sprites.CardSprites
+    cards: List[card.Card]
+
+    def __init__(self, sheet: Optional[pygame.Surface] = None) -> None:
+        """ Initialize a renderer using sheet, or the card sprite sheet """
+        if sheet is None:
+            sheet = pygame.image.load(SHEET_PATH)
+        self.images = sprites.CardSprites(sheet)
+        self.cards = [card.Card(i, j) for i in range(4) for j in range(13)]
+
+    def draw(self, state: engine.GameState,
+             surface: Optional[pygame.Surface] = None) -> pygame.Surface:
+        """
+        Draw state onto surface, or a new surface the size of the screen,
+        and return it
+        """
+        if surface is None:
+            surface = pygame.Surface((c.SCREEN_WIDTH, c.SCREEN_HEIGHT))
+        surface.fill(c.BACK_COLOUR)
+
+        # Draw border for the valid positions except the hand
+        for key, (x, y) in c.PILE_SPOTS.items():
+            if "HAND" not in key:
+                pygame.draw.rect(surface, (255, 255, 255), pygame.Rect(
+                    x, y, c.CARD_WIDTH, c.CARD_HEIGHT), 1)
+
+        # Draw each pile from the bottom card up, the hand closest to the
+        # deck last as it sits on the others
+        for pile, name in enumerate(engine.PILES):
+            x, y = c.PILE_SPOTS[name]
+            spread = 15 if pile in engine.TABLES else 0
+            for index, number in enumerate(state.piles[pile]):
+                shown = self.cards[number]
+                shown.set_x(x)
+                shown.set_y(y + spread * index)
+                shown.set_visible(state.is_visible(number))
+                shown.draw(self.images, surface)
+        return surface
+
+    def save(self, state: engine.GameState, path: str,
+             width: Optional[int] = None) -> None:
+        """ Draw state to a png at path, scaled down to width if given """
+        surface = self.draw(state)
+        if width is not None:
+            surface = pygame.transform.smoothscale(surface, (
+                width, width * c.SCREEN_HEIGHT // c.SCREEN_WIDTH))
+        pygame.image.save(surface, path)
+
+
+# Renderer of each worker process, made once when the worker starts
+_worker: Dict[str, BoardRenderer] = {}
+
+
+def start_worker() -> None:
+    """ Load the sprites once for all the jobs of a worker """
+    _worker["renderer"] = BoardRenderer()
+
+
+def render_job(job: Tuple[bytes, str, Optional[int]]) -> str:
+    """ Draw the packed state of the job to its path """
+    data, path, width = job
+    _worker["renderer"].save(engine.GameState.unpack(data), path, width)
+    return path
+
+
+def render_batch(jobs: List[Tuple[bytes, str, Optional[int]]],
+                 processes: Optional[int] = None) -> int:
+    """
+    Draw each job, a state made by GameState.pack, the path of the png to
+    draw it to and the width to scale to or None, across a pool of
+    processes
+    Returns the number of pngs drawn
+    """
+    drawn = 0
+    # Workers start fresh instead of forking, a forked copy of a process
+    # with pygame running can hang
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, start_worker) as pool:
+        for _ in pool.imap_unordered(render_job, jobs, chunksize=64):
+            drawn += 1
+    return drawn
+
+
+def deal_jobs(start: int, count: int, folder: str,
+              width: Optional[int] = None) -> List[Tuple[bytes, str,
+                                                         Optional[int]]]:
+    """ Make a job to preview each of count deals from start """
+    packed = deals.bulk_deals(start, count)
+    state = engine.GameState()
+    jobs = []
+    for number in range(start, start + count):
+        offset = (number - start) * 52
+        state.deal(packed[offset:offset + 52])
+        jobs.append((state.pack(), os.path.join(
+            folder, "deal_{}.png".format(number)), width))
+    return jobs
+
+
+if __name__ == "__main__":
+    # python thumbnails.py folder start count [width]
+    # Draw a preview of each deal, timing the whole batch
+    import sys
+    import time
+
+    os.makedirs(sys.argv[1], exist_ok=True)
+    begin = time.perf_counter()
+    total = render_batch(deal_jobs(
+        int(sys.argv[2]), int(sys.argv[3]), sys.argv[1],
+        int(sys.argv[4]) if len(sys.argv) > 4 else None))
+    seconds = time.perf_counter() - begin
+    print("{} images in {:.1f} s, {:.0f} images/s".format(
+        total, seconds, total / max(seconds, 1e-9)))
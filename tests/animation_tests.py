@@ -0,0 +1,51 @@
+import animation
+import unittest
+
+
+def run(frame_seconds, frames):
+    """ Slide a card for frames frames of frame_seconds, get its spots """
+    animator = animation.Animator(0.01, 5)
+    animator.slide("HEARTSA", (0, 0), (100, 50), 10)
+    spots = []
+    for frame in range(frames):
+        animator.advance(frame * frame_seconds)
+        spots.append(animator.positions().get("HEARTSA"))
+    return spots
+
+
+class TestAnimation(unittest.TestCase):
+    def test_frame_rate(self):
+        """ Tests a slide takes the same time at any frame rate """
+        slow = run(0.04, 6)
+        fast = run(0.005, 41)
+        # The same moments of the slide show the card in the same place
+        self.assertEqual(slow[1], fast[8])
+        self.assertEqual(slow[2], fast[16])
+        self.assertEqual(slow[3], (100, 50))
+        self.assertEqual(fast[23], (100, 50))
+        self.assertIsNone(slow[-1])
+        self.assertIsNone(fast[-1])
+
+    def test_interpolate(self):
+        """ Tests a card is drawn between its last two steps """
+        animator = animation.Animator(0.01, 5)
+        animator.slide("HEARTSA", (0, 0), (100, 0), 10)
+        animator.advance(0)
+        animator.advance(0.015)
+        x = animator.positions()["HEARTSA"][0]
+        step = animator.slides["HEARTSA"].at(1)[0]
+        self.assertEqual(x, round(step / 2))
+
+    def test_skip_frames(self):
+        """ Tests a long frame only runs the most steps allowed """
+        animator = animation.Animator(0.01, 5)
+        animator.slide("HEARTSA", (0, 0), (100, 0), 10)
+        animator.advance(0)
+        self.assertEqual(animator.advance(1), 5)
+        self.assertTrue(animator.busy())
+        self.assertEqual(animator.finish(), {"HEARTSA": (100, 0)})
+        self.assertFalse(animator.busy())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import archive
+import engine
+import os
+import tempfile
+import unittest
+
+
+def played(moves):
+    """ Get a dealt game with the first legal move made moves times """
+    state = engine.GameState()
+    state.deal(range(52))
+    for _ in range(moves):
+        state.apply(state.legal_moves()[0])
+    return state
+
+
+class TestArchive(unittest.TestCase):
+    def test_record(self):
+        """ Tests a record is the same size and loads the same game """
+        for state in (engine.GameState(), played(0), played(30)):
+            data = archive.pack_record(1, 9, state)
+            self.assertEqual(len(data), archive.RECORD_SIZE)
+            deal_number, loaded = archive.unpack_record(data)
+            self.assertEqual(deal_number, 9)
+            self.assertEqual(loaded, state)
+            self.assertEqual(loaded.hidden, state.hidden)
+
+    def test_save_load(self):
+        """ Tests a saved game loads back and other files are refused """
+        path = os.path.join(tempfile.mkdtemp(), "game.sav")
+        archive.save(path, 5, played(10))
+        self.assertEqual(archive.load(path), (5, played(10)))
+        with open(path, "wb") as file:
+            file.write(b"SOLR")
+        with self.assertRaises(ValueError):
+            archive.load(path)
+
+    def test_archive(self):
+        """ Tests games are found by key, newest first, after reopening """
+        path = os.path.join(tempfile.mkdtemp(), "games.arc")
+        with archive.ArchiveWriter(path) as writer:
+            for key in range(50, 0, -1):
+                writer.add(key * 3, key, played(key % 7))
+        with archive.ArchiveWriter(path) as writer:
+            writer.add(30, 99, played(3))
+        # A record cut off part way is dropped when opened again
+        with open(path, "ab") as file:
+            file.write(b"\0" * 10)
+        with archive.ArchiveWriter(path) as writer:
+            writer.add(1000, 7, played(0))
+        with archive.ArchiveReader(path) as reader:
+            self.assertEqual(len(reader), 51)
+            self.assertEqual(reader.get(3 * 4), (4, played(4)))
+            self.assertEqual(reader.get(30), (99, played(3)))
+            self.assertEqual(reader.get(1000), (7, played(0)))
+            self.assertIsNone(reader.get(31))
+
+
+if __name__ == '__main__':
+    unittest.main()
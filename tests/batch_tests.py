@@ -0,0 +1,28 @@
+import batch
+import os
+import tempfile
+import unittest
+
+
+class TestBatch(unittest.TestCase):
+    def test_missing_ranges(self):
+        """ Tests solved deals are skipped and ranges are split by size """
+        self.assertEqual(batch.missing_ranges(0, 10, {2, 3, 7}, 3),
+                         [(0, 2), (4, 7), (8, 10)])
+
+    def test_resume(self):
+        """ Tests a cut off file is finished without solving deals twice """
+        path = os.path.join(tempfile.mkdtemp(), "deals.csv")
+        with open(path, "w") as file:
+            file.write("1,no,5\n3,n")
+        self.assertEqual(batch.run_batch(path, 0, 6, 2, 2, 50), 5)
+        with open(path) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(sorted(int(line.split(",")[0]) for line in lines),
+                         list(range(6)))
+        self.assertEqual(lines[0], "1,no,5")
+        self.assertEqual(batch.run_batch(path, 0, 6, 2, 2, 50), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import benchmark
+import game
+import json
+import unittest
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_all(self):
+        """ Tests every benchmark runs and the results can be saved """
+        report = json.loads(json.dumps(benchmark.run_all(1)))
+        self.assertEqual(set(report["results"]), {
+            "get_pressed", "check_pile", "save_state", "move_to_hand_undo",
+            "move_to_hand", "stock_cycle", "draw_full", "drag_and_drop"})
+        for result in report["results"].values():
+            self.assertGreater(result["calls"], 0)
+            self.assertGreater(result["min_us"], 0)
+
+    def test_drag_and_drop(self):
+        """ Tests dragging a card around and dropping it makes no move """
+        g = game.Game(benchmark.DEAL_NUMBER)
+        before = g.save_state()
+        benchmark.drag_and_drop(g)
+        self.assertEqual(g.save_state(), before)
+        self.assertIsNone(g.held_card)
+
+
+if __name__ == '__main__':
+    unittest.main()
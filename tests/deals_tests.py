@@ -0,0 +1,32 @@
+import deals
+import unittest
+
+
+class TestDeals(unittest.TestCase):
+    def test_deal_order(self):
+        """ Tests a deal number always gives the same shuffle of every card """
+        order = deals.deal_order(7)
+        self.assertEqual(sorted(order), list(range(52)))
+        self.assertEqual(deals.deal_order(7), order)
+        self.assertNotEqual(deals.deal_order(8), order)
+
+    def test_bulk_deals(self):
+        """ Tests bulk deals match the deals made one at a time """
+        packed = deals.bulk_deals(1000, 20)
+        self.assertEqual(len(packed), 20 * 52)
+        for offset in range(20):
+            self.assertEqual(list(packed[offset * 52:(offset + 1) * 52]),
+                             deals.deal_order(1000 + offset))
+
+    def test_bulk_deals_python(self):
+        """ Tests deals made without numpy match the ones made with it """
+        packed = deals.bulk_deals(5, 3)
+        np, deals.np = deals.np, None
+        try:
+            self.assertEqual(deals.bulk_deals(5, 3), packed)
+        finally:
+            deals.np = np
+
+
+if __name__ == '__main__':
+    unittest.main()
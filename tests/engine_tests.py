@@ -0,0 +1,211 @@
+import engine
+import unittest
+
+
+def card(key):
+    """ Get the card number for the card key """
+    return engine.IDS[key]
+
+
+def ids(*keys):
+    """ Get the card numbers for the card keys """
+    return [engine.IDS[key] for key in keys]
+
+
+class TestGameState(unittest.TestCase):
+    def test_deal(self):
+        """ Tests dealing puts 28 cards on the table and 24 in the deck """
+        s = engine.GameState()
+        s.deal(range(52))
+        for a in range(7):
+            self.assertEqual(len(s.piles[engine.TABLE0 + a]), a + 1)
+            self.assertTrue(s.is_visible(s.piles[engine.TABLE0 + a][-1]))
+        self.assertEqual(len(s.piles[engine.DECK]), 24)
+        self.assertFalse(s.is_locked(s.piles[engine.DECK][-1]))
+        self.assertTrue(s.is_locked(s.piles[engine.DECK][-2]))
+
+    def test_will_table_take(self):
+        """ Tests the table only takes the opposite colour one rank lower """
+        s = engine.GameState()
+        s.piles[engine.TABLE0].extend(ids("HEARTSK", "SPADESQ"))
+        self.assertTrue(s.will_table_take(card("DIAMONDSJ"), engine.TABLE0))
+        self.assertFalse(s.will_table_take(card("CLUBSJ"), engine.TABLE0))
+        self.assertFalse(s.will_table_take(card("HEARTS10"), engine.TABLE0))
+        self.assertTrue(s.will_table_take(card("CLUBSK"), engine.TABLE0 + 1))
+        self.assertFalse(s.will_table_take(card("CLUBSQ"), engine.TABLE0 + 1))
+
+    def test_will_ace_take(self):
+        """ Tests the final piles only take the same suit one rank higher """
+        s = engine.GameState()
+        self.assertTrue(s.will_ace_take(card("SPADESA"), engine.ACE0))
+        self.assertFalse(s.will_ace_take(card("SPADES2"), engine.ACE0))
+        s.push(engine.ACE0, engine.IDS["SPADESA"])
+        self.assertTrue(s.will_ace_take(card("SPADES2"), engine.ACE0))
+        self.assertFalse(s.will_ace_take(card("CLUBS2"), engine.ACE0))
+
+    def test_draw_and_reset(self):
+        """ Tests drawing the whole deck then putting it back """
+        s = engine.GameState()
+        s.deal(range(52))
+        deck = s.piles[engine.DECK][:]
+        while len(s.piles[engine.DECK]) != 0:
+            s.apply((engine.DRAW, engine.DECK, engine.HAND0, 1))
+        self.assertEqual(len(s.piles[engine.HAND1]), 1)
+        self.assertEqual(len(s.piles[engine.HAND2]), 1)
+        self.assertEqual(s.legal_moves()[0][0], engine.RESET)
+        s.apply((engine.RESET, engine.HAND0, engine.DECK, 0))
+        self.assertEqual(s.piles[engine.DECK], deck)
+        for card in deck:
+            self.assertFalse(s.is_visible(card))
+
+    def test_move_stack_reveals(self):
+        """ Tests moving the top card of a table shows the card under it """
+        s = engine.GameState()
+        s.piles[engine.TABLE0].extend(ids("CLUBS5", "HEARTSK"))
+        s.take_out_play(engine.IDS["CLUBS5"])
+        s.apply((engine.PLACE, engine.TABLE0, engine.TABLE0 + 1, 1))
+        self.assertEqual(list(s.piles[engine.TABLE0 + 1]), ids("HEARTSK"))
+        self.assertEqual(s.find(engine.IDS["HEARTSK"]), engine.TABLE0 + 1)
+        self.assertTrue(s.is_visible(engine.IDS["CLUBS5"]))
+        self.assertFalse(s.is_locked(engine.IDS["CLUBS5"]))
+
+    def test_legal_moves(self):
+        """ Tests finding the moves for stacks and single cards """
+        s = engine.GameState()
+        s.piles[engine.TABLE0].extend(ids("HEARTSK", "SPADESQ"))
+        s.push(engine.TABLE0 + 1, engine.IDS["CLUBSK"])
+        s.push(engine.HAND0, engine.IDS["DIAMONDSQ"])
+        moves = s.legal_moves()
+        self.assertIn(
+            (engine.PLACE, engine.TABLE0, engine.TABLE0 + 2, 2), moves)
+        self.assertIn(
+            (engine.PLACE, engine.HAND0, engine.TABLE0 + 1, 1), moves)
+        self.assertNotIn((engine.PLACE, engine.TABLE0, engine.ACE0, 2), moves)
+        self.assertNotIn((engine.DRAW, engine.DECK, engine.HAND0, 1), moves)
+
+    def test_lookup_tables(self):
+        """ Tests the tables agree with the rules for a few cards """
+        row = card("HEARTS9") * 53
+        self.assertEqual(engine.STACKS_ON[row + card("CLUBS10")], 1)
+        self.assertEqual(engine.STACKS_ON[row + card("DIAMONDS10")], 0)
+        self.assertEqual(engine.FOUNDS_ON[row + card("HEARTS8")], 1)
+        self.assertEqual(engine.FOUNDS_ON[row + engine.EMPTY], 0)
+        self.assertEqual(
+            engine.STACKS_ON[card("SPADESK") * 53 + engine.EMPTY], 1)
+
+    def test_legal_moves_dealt(self):
+        """ Tests the moves of a new deal come from the deck and the table """
+        s = engine.GameState()
+        s.deal(range(52))
+        for kind, src, dst, count in engine.legal_moves(s):
+            self.assertTrue(kind == engine.DRAW or src in engine.TABLES)
+            self.assertFalse(s.is_locked(s.piles[src][-count]))
+
+    def test_pack_unpack(self):
+        """ Tests a packed state comes back the same """
+        s = engine.GameState()
+        s.deal(range(52))
+        s.apply((engine.DRAW, engine.DECK, engine.HAND0, 1))
+        data = s.pack()
+        self.assertEqual(len(data), 15 + 52 + 14)
+        self.assertEqual(engine.GameState.unpack(data), s)
+
+    def test_copy(self):
+        """ Tests changing a copy leaves the original alone """
+        s = engine.GameState()
+        s.deal(range(52))
+        other = s.copy()
+        other.apply((engine.DRAW, engine.DECK, engine.HAND0, 1))
+        self.assertNotEqual(other, s)
+        self.assertEqual(len(s.piles[engine.HAND0]), 0)
+
+    def test_pile_view(self):
+        """ Tests changing a pile through its card keys """
+        s = engine.GameState()
+        view = engine.PileView(s, engine.ACE0)
+        view.append("HEARTSA")
+        view.extend(["HEARTS2", "HEARTS3"])
+        self.assertEqual(view.pop(), "HEARTS3")
+        self.assertEqual(view + [], ["HEARTSA", "HEARTS2"])
+        self.assertEqual(s.find(engine.IDS["HEARTS3"]), engine.NO_PILE)
+        view.clear()
+        self.assertEqual(view, [])
+
+    def test_undo_all(self):
+        """ Tests undoing every move goes back to the dealt state """
+        s = engine.GameState()
+        s.deal(range(51, -1, -1))
+        start = s.pack()
+        for _ in range(60):
+            s.apply(s.legal_moves()[-1])
+        while s.undo_count != 0:
+            s.undo()
+        self.assertEqual(s.pack(), start)
+        self.assertEqual(s.undo(), [])
+
+    def test_zobrist(self):
+        """ Tests the hash follows moves and undos and matches equal states """
+        s = engine.GameState()
+        s.deal(range(52))
+        start = s.zobrist()
+        for _ in range(40):
+            s.apply(s.legal_moves()[-1])
+        moved = s.zobrist()
+        self.assertNotEqual(moved, start)
+        other = engine.GameState.unpack(s.pack())
+        self.assertEqual(other.zobrist(), moved)
+        self.assertEqual(hash(other), hash(s))
+        while s.undo_count != 0:
+            s.undo()
+        self.assertEqual(s.zobrist(), start)
+        view = engine.PileView(s, engine.TABLE0 + 1)
+        view.insert(0, view.pop())
+        placement = s.placement
+        s.rehash()
+        self.assertEqual(s.placement, placement)
+
+    def test_undo_limit(self):
+        """ Tests only the newest moves are kept past the limit """
+        s = engine.GameState(3)
+        s.deal(range(52))
+        for _ in range(5):
+            s.apply((engine.DRAW, engine.DECK, engine.HAND0, 1))
+        self.assertEqual(s.undo_count, 3)
+        self.assertEqual(s.undo(), [engine.DECK, engine.HAND0,
+                                    engine.HAND1, engine.HAND2])
+        self.assertEqual(len(s.piles[engine.DECK]), 20)
+
+    def test_counters(self):
+        """ Tests the final pile and face down counts follow moves and undo """
+        s = engine.GameState()
+        s.deal(range(52))
+        self.assertEqual((s.founded, s.hidden), (0, 21))
+        for _ in range(80):
+            moves = s.legal_moves()
+            s.apply(moves[len(moves) // 2])
+            founded, hidden = s.founded, s.hidden
+            s.recount()
+            self.assertEqual((s.founded, s.hidden), (founded, hidden))
+        while s.undo_count != 0:
+            s.undo()
+        self.assertEqual((s.founded, s.hidden), (0, 21))
+        self.assertEqual(engine.GameState.unpack(s.pack()).hidden, 21)
+
+    def test_finish(self):
+        """ Tests a game with every card face up on the table is won at once"""
+        s = engine.GameState()
+        s.visible = (1 << 52) - 1
+        for suit in range(4):
+            for rank in range(12, -1, -1):
+                s.push(engine.TABLE0 + suit, suit * 13 + rank)
+        self.assertTrue(s.can_finish())
+        self.assertFalse(s.is_won())
+        self.assertEqual(len(s.finish()), 52)
+        self.assertTrue(s.is_won())
+        s.undo()
+        self.assertEqual(s.founded, 51)
+        self.assertFalse(s.is_won())
+
+
+if __name__ == '__main__':
+    unittest.main()
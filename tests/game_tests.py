@@ -2,7 +2,10 @@ import pygame
 import card
 import random
 import copy
+import os
+import tempfile
 import game
+import replay
 import constants as c
 import unittest
 
@@ -299,8 +302,6 @@ class TestGame(unittest.TestCase):
     def test_undo_move_to_hand(self):
         """ Test moving a card from the deck to the hand and undoing"""
         g = game.Game()
-        save = g.save_state()
-        g.last.append(save)
         test_deck = g.valid_pos["DECK"][2] + []
         test_card = g.valid_pos["DECK"][2][-1]
         g.move_to_hand(test_card)
@@ -312,21 +313,320 @@ class TestGame(unittest.TestCase):
         self.assertEqual(g.valid_pos["HAND0"][2], [])
         self.assertEqual(g.valid_pos["DECK"][2], test_deck)
 
+    def test_drag_events(self):
+        """ Test dragging a card with mouse events and dropping it nowhere"""
+        g = game.Game(1)
+        key = g.valid_pos["TABLE0"][2][-1]
+        x, y = g.cards[key].get_x() + 5, g.cards[key].get_y() + 5
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, button=1, pos=(x, y)))
+        self.assertEqual(g.held_card, key)
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEMOTION, buttons=(1, 0, 0), pos=(x + 300, y + 300)))
+        self.assertEqual(g.cards[key].get_x(), x - 5 + 300)
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEBUTTONUP, button=1, pos=(x + 300, y + 300)))
+        self.assertIsNone(g.held_card)
+        self.assertEqual(g.cards[key].get_x(), x - 5)
+
+    def test_profile_overlay(self):
+        """ Test F3 draws the frame times over the game every frame"""
+        g = game.Game()
+        g.draw()
+        self.assertEqual(g.draw_dirty(), [])
+        g.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_F3))
+        g.draw()
+        self.assertEqual(g.draw_dirty(), [pygame.Rect(c.PROFILE_RECT)])
+
+    def test_run_quit(self):
+        """ Test the game loop wakes up for a quit and stops"""
+        g = game.Game()
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+        g.run()
+        self.assertFalse(g.running)
+
+    def test_play_replay(self):
+        """ Test a recorded game plays back to the same place"""
+        g = game.Game(3)
+        for _ in range(24):
+            g.move_to_hand(g.valid_pos["DECK"][2][-1])
+        g.reset_deck()
+        g.move_to_hand(g.valid_pos["DECK"][2][-1])
+        g.undo()
+        data = g.recorder.data()
+        self.assertEqual(replay.replay(data), g.state)
+        other = game.Game()
+        other.play_replay(data, 0)
+        self.assertEqual(other.save_state(), g.save_state())
+        self.assertEqual(other.card_order, g.card_order)
+
+    def test_play_replay_slides(self):
+        """ Test a replay shows the cards sliding and ends in the same place"""
+        g = game.Game(3)
+        g.move_to_hand(g.valid_pos["DECK"][2][-1])
+        g.reset_deck()
+        data = g.recorder.data()
+        other = game.Game(animate=True)
+        frames = []
+        draw = other.draw
+        other.draw = lambda: frames.append(draw())
+        other.play_replay(data, 0)
+        # More than the first frame and one frame a move
+        self.assertGreater(len(frames), 3)
+        self.assertFalse(other.animator.busy())
+        for key in g.cards:
+            self.assertEqual(
+                (other.cards[key].get_x(), other.cards[key].get_y()),
+                (g.cards[key].get_x(), g.cards[key].get_y()))
+
+    def test_save_and_load(self):
+        """ Test a saved game carries on from the same place"""
+        g = game.Game(3)
+        for _ in range(4):
+            g.move_to_hand(g.valid_pos["DECK"][2][-1])
+        path = os.path.join(tempfile.mkdtemp(), "game.sav")
+        g.save_game(path)
+        other = game.Game(5)
+        other.load_game(path)
+        self.assertEqual(other.deal_number, 3)
+        self.assertEqual(other.save_state(), g.save_state())
+        for key in g.cards:
+            self.assertEqual(
+                (other.cards[key].get_x(), other.cards[key].get_y(),
+                 other.cards[key].get_locked()),
+                (g.cards[key].get_x(), g.cards[key].get_y(),
+                 g.cards[key].get_locked()))
+        # The loaded game keeps being played
+        other.move_to_hand(other.valid_pos["DECK"][2][-1])
+        other.undo()
+        self.assertEqual(other.save_state(), g.save_state())
+
+    def test_deal_number(self):
+        """ Test the same deal number always deals the same cards"""
+        g = game.Game(42)
+        self.assertEqual(g.deal_number, 42)
+        self.assertEqual(game.Game(42).save_state(), g.save_state())
+        self.assertNotEqual(game.Game(43).save_state(), g.save_state())
+
+    def test_position_key(self):
+        """ Test the position key changes with a move and comes back on undo"""
+        g = game.Game()
+        start = g.position_key()
+        g.move_to_hand(g.valid_pos["DECK"][2][-1])
+        self.assertNotEqual(g.position_key(), start)
+        g.undo()
+        self.assertEqual(g.position_key(), start)
+
+    def test_reset_keeps_assets(self):
+        """ Test a new game deals the same cards without loading again"""
+        g = game.Game(5)
+        cards = dict(g.cards)
+        screen = g.screen
+        g.move_to_hand(g.valid_pos["DECK"][2][-1])
+        g.held_card = "HEARTSA"
+        g.reset(5)
+        self.assertIs(g.screen, screen)
+        self.assertEqual(g.cards, cards)
+        self.assertEqual(len(g.card_order), 52)
+        self.assertIsNone(g.held_card)
+        self.assertEqual(g.save_state(), game.Game(5).save_state())
+        self.assertEqual(g.recorder.moves, bytearray())
+
+    def test_run_play_again(self):
+        """ Test winning and playing again stays in the same loop"""
+        g = game.Game()
+        g.play_again = lambda: True
+        wins = iter([True, False])
+        g.check_win = lambda: next(wins)
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a))
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+        g.run()
+        self.assertFalse(g.running)
+        self.assertEqual(len(g.valid_pos["DECK"][2]), 24)
+
+    def test_auto_finish(self):
+        """ Test the cards left on the table all go to the Ace spots"""
+        g = game.Game()
+        for key in g.valid_pos:
+            g.valid_pos[key][2].clear()
+        for table, keys in (("TABLE0", ("SPADESK", "HEARTSQ", "SPADESJ")),
+                            ("TABLE1", ("HEARTSK", "SPADESQ"))):
+            for key in keys:
+                g.make_in_play(key)
+                g.valid_pos[table][2].append(key)
+        # Spades up to 10 and hearts up to J are already on the Ace spots
+        for index, suit in enumerate(c.SUITS):
+            for rank in c.RANKS[:{"SPADES": 10, "HEARTS": 11}.get(suit, 13)]:
+                g.valid_pos["ACE" + str(index)][2].append(suit + rank)
+        self.assertTrue(g.state.can_finish())
+        g.auto_finish()
+        self.assertTrue(g.check_win())
+        self.assertEqual(g.card_order.top(), "SPADESK")
+        self.assertEqual(
+            (g.cards["HEARTSQ"].get_x(), g.cards["HEARTSQ"].get_y()),
+            (g.valid_pos["ACE0"][0], g.valid_pos["ACE0"][1]))
+
+    def test_hint(self):
+        """ Test a hint is outlined and searched again after each move"""
+        g = game.Game(1)
+        g.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_h))
+        search = g.hint
+        search.thread.join(5)
+        for event in pygame.event.get(game.HINT_EVENT):
+            g.handle_event(event)
+        self.assertEqual(len(g.hint_rects), 2)
+        g.move_to_hand(g.valid_pos["DECK"][2][-1])
+        self.assertTrue(search.cancelled.is_set())
+        self.assertIsNot(g.hint, search)
+        g.undo()
+        g.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_h))
+        self.assertIsNone(g.hint)
+
+    def test_slide(self):
+        """ Test a drawn card slides to the hand instead of jumping there"""
+        g = game.Game(1, animate=True)
+        key = g.valid_pos["DECK"][2][-1]
+        g.move_to_hand(key)
+        self.assertEqual(g.cards[key].get_x(), g.valid_pos["DECK"][0])
+        while g.animator.busy():
+            g.step_slides()
+        self.assertEqual(
+            (g.cards[key].get_x(), g.cards[key].get_y()),
+            (g.valid_pos["HAND0"][0], g.valid_pos["HAND0"][1]))
+        g.reset_deck()
+        g.finish_slides()
+        self.assertEqual(g.cards[key].get_x(), g.valid_pos["DECK"][0])
+
+    def test_runs_animated(self):
+        """ Test the face down runs are found once the cards stop sliding"""
+        g = game.Game(1, animate=True)
+        still = game.Game(1)
+        self.assertEqual(g.runs, still.runs)
+        self.assertEqual(len(g.runs[14]), 6)
+        g.reset(1)
+        self.assertEqual(g.runs, still.runs)
+        for other in (g, still):
+            for _ in range(3):
+                other.move_to_hand(other.valid_pos["DECK"][2][-1])
+            other.reset_deck()
+        # The cards put back in the deck join its run once they get there
+        self.assertEqual(len(g.runs[0]), 21)
+        while g.animator.busy():
+            g.step_slides()
+        self.assertEqual(g.runs, still.runs)
+
+    def test_cached_layers(self):
+        """ Test drawing from the cached layers matches drawing every card"""
+        g = game.Game(2)
+        for _ in range(3):
+            g.move_to_hand(g.valid_pos["DECK"][2][-1])
+        g.draw()
+        cached = pygame.image.tobytes(g.screen, "RGB")
+        self.assertEqual(len(g.runs[14]), 6)
+        g.runs = {}
+        g.run_keys = set()
+        g.dirty.invalidate()
+        g.draw()
+        self.assertEqual(pygame.image.tobytes(g.screen, "RGB"), cached)
+
+    def test_drag_stack(self):
+        """ Test a dragged stack is drawn as one the same as card by card"""
+        g = game.Game(1)
+        for key in g.valid_pos:
+            g.valid_pos[key][2].clear()
+        for key in ("HEARTSK", "SPADESQ", "HEARTSJ", "SPADES10"):
+            g.make_in_play(key)
+            g.valid_pos["TABLE0"][2].append(key)
+        g.layout(*range(len(g.valid_pos)))
+        x, y = g.cards["SPADESQ"].get_x() + 5, g.cards["SPADESQ"].get_y() + 5
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, button=1, pos=(x, y)))
+        self.assertIsNotNone(g.board)
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEMOTION, buttons=(1, 0, 0), pos=(x + 200, y + 50)))
+        g.draw()
+        dragged = pygame.image.tobytes(g.screen, "RGB")
+        board = g.board
+        g.board = None
+        g.dirty.invalidate()
+        g.draw()
+        self.assertEqual(pygame.image.tobytes(g.screen, "RGB"), dragged)
+        g.board = board
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEBUTTONUP, button=1, pos=(x + 200, y + 50)))
+        self.assertIsNone(g.board)
+        self.assertEqual(g.cards["SPADES10"].get_y(), y - 5 + 30)
+        self.assertEqual(g.get_pressed(x + 5, y + 35)[1], "SPADES10")
+
+    def test_grab_twice(self):
+        """ Test a card grabbed and let go without moving stays drawn"""
+        g = game.Game(1)
+        g.draw()
+        for _ in range(2):
+            g.handle_event(pygame.event.Event(
+                pygame.MOUSEBUTTONDOWN, button=1, pos=(160, 140)))
+            g.draw()
+            g.handle_event(pygame.event.Event(
+                pygame.MOUSEBUTTONUP, button=1, pos=(160, 140)))
+            g.draw()
+        drawn = pygame.image.tobytes(g.screen, "RGB")
+        g.dirty.invalidate()
+        g.draw()
+        self.assertEqual(pygame.image.tobytes(g.screen, "RGB"), drawn)
+
+    def test_play_from_hand_unlocks(self):
+        """ Test the card before one played from the hand can be grabbed"""
+        g = game.Game(1)
+        deck = (g.valid_pos["DECK"][0] + 5, g.valid_pos["DECK"][1] + 5)
+        for _ in range(3):
+            g.handle_event(pygame.event.Event(
+                pygame.MOUSEBUTTONDOWN, button=1, pos=deck))
+            g.handle_event(pygame.event.Event(
+                pygame.MOUSEBUTTONUP, button=1, pos=deck))
+        self.assertEqual(g.valid_pos["HAND1"][2], ["DIAMONDS6"])
+        x, y = g.cards["CLUBSA"].get_x() + 5, g.cards["CLUBSA"].get_y() + 5
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, button=1, pos=(x, y)))
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEBUTTONUP, button=1,
+            pos=(g.valid_pos["ACE0"][0] + 5, g.valid_pos["ACE0"][1] + 5)))
+        self.assertEqual(g.valid_pos["ACE0"][2], ["CLUBSA"])
+        self.assertFalse(g.cards["DIAMONDS6"].get_locked())
+        x = g.cards["DIAMONDS6"].get_x() + c.CARD_WIDTH - 5
+        y = g.cards["DIAMONDS6"].get_y() + 5
+        g.handle_event(pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, button=1, pos=(x, y)))
+        self.assertEqual(g.held_card, "DIAMONDS6")
+
+    def test_undo_draw_unlocks(self):
+        """ Test undoing a draw into the hand unlocks the card before it"""
+        g = game.Game(1)
+        for _ in range(3):
+            g.move_to_hand(g.valid_pos["DECK"][2][-1])
+        self.assertTrue(g.cards["DIAMONDS6"].get_locked())
+        g.undo()
+        self.assertFalse(g.cards["DIAMONDS6"].get_locked())
+
     def test_undo_move_multiple_cards(self):
         """ Test moving a stack of cards from on spot to another on the table"""
         g = game.Game()
-        g.held_card = "HEARTS3"
-        g.held_stack = ["CLUBS2", "DIAMONDSA"]
-        g.valid_pos["TABLE1"][2].extend(["HEARTS3", "CLUBS2", "DIAMONDSA"])
+        for key in g.valid_pos:
+            g.valid_pos[key][2].clear()
+        g.valid_pos["TABLE1"][2].extend(["SPADESK", "HEARTSQ", "CLUBSJ"])
+        g.held_card = "SPADESK"
+        g.held_stack = ["HEARTSQ", "CLUBSJ"]
+        g.old_x = g.valid_pos["TABLE1"][0]
+        g.old_y = g.valid_pos["TABLE1"][1]
         old_table_0 = g.valid_pos["TABLE0"][2] + []
         old_table_1 = g.valid_pos["TABLE1"][2] + []
-        g.last = [g.save_state()]
-        g.move_cards(g.valid_pos["TABLE0"][0], g.valid_pos["TABLE0"][1])
-        g.valid_pos["TABLE0"][2].append(g.held_card)
-        g.valid_pos["TABLE0"][2].extend(g.held_stack)
+        g.let_go(g.valid_pos["TABLE0"][0], g.valid_pos["TABLE0"][1])
+        self.assertEqual(g.valid_pos["TABLE0"][2], old_table_1)
         g.undo()
         self.assertEqual(g.valid_pos["TABLE0"][2], old_table_0)
         self.assertEqual(g.valid_pos["TABLE1"][2], old_table_1)
+        self.assertEqual(
+            (g.cards["CLUBSJ"].get_x(), g.cards["CLUBSJ"].get_y()),
+            (g.valid_pos["TABLE1"][0], g.valid_pos["TABLE1"][1] + 30))
 
 
 if __name__ == '__main__':
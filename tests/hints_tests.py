@@ -0,0 +1,42 @@
+import engine
+import hints
+import time
+import unittest
+
+
+class TestHints(unittest.TestCase):
+    def test_finds_win(self):
+        """ Tests the search finds the move that wins straight away """
+        s = engine.GameState()
+        s.visible = (1 << 52) - 1
+        for suit in range(4):
+            for rank in range(12, -1, -1):
+                s.push(engine.TABLE0 + suit, suit * 13 + rank)
+        s.finish()
+        s.undo()
+        hint = hints.HintSearch(s, 5)
+        hint.run()
+        self.assertEqual(hint.value, hints.WIN)
+        self.assertEqual(hint.best[0], engine.PLACE)
+        self.assertIn(hint.best[2], engine.ACES)
+        self.assertTrue(hint.finished)
+        self.assertEqual(s.founded, 51)
+
+    def test_anytime(self):
+        """ Tests a move is ready soon and the search can be cancelled """
+        s = engine.GameState()
+        s.deal(range(52))
+        updates = []
+        hint = hints.HintSearch(s, 30, lambda: updates.append(hint.best))
+        hint.start()
+        while len(updates) == 0:
+            time.sleep(0.001)
+        self.assertIn(hint.best, s.legal_moves())
+        hint.cancel()
+        hint.thread.join(1)
+        self.assertFalse(hint.thread.is_alive())
+        self.assertTrue(hint.finished)
+
+
+if __name__ == '__main__':
+    unittest.main()
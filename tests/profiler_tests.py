@@ -0,0 +1,49 @@
+import json
+import os
+import profiler
+import tempfile
+import unittest
+
+
+class TestFrameProfiler(unittest.TestCase):
+    def test_laps(self):
+        """ Tests the time of each phase adds up to the frame """
+        p = profiler.FrameProfiler(["input", "draw"])
+        for _ in range(3):
+            p.begin()
+            p.lap("input")
+            p.lap("draw")
+            p.lap("input")
+            p.end()
+        self.assertEqual(p.frames, 3)
+        self.assertEqual(len(p.history["draw"]), 3)
+        self.assertAlmostEqual(
+            p.current["input"] + p.current["draw"], p.history["frame"][-1])
+
+    def test_percentile(self):
+        """ Tests percentiles only look at the last frames kept """
+        p = profiler.FrameProfiler(["draw"], 4)
+        p.history["draw"].extend([9.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(p.percentile("draw", 50), 3.0)
+        self.assertEqual(p.percentile("draw", 100), 4.0)
+        self.assertEqual(p.percentile("frame", 50), 0.0)
+
+    def test_dump(self):
+        """ Tests the dump holds every phase and the slow frames """
+        p = profiler.FrameProfiler(["draw"])
+        p.begin()
+        p.started -= 1
+        p.last -= 1
+        p.lap("draw")
+        p.end()
+        path = os.path.join(tempfile.mkdtemp(), "profile.json")
+        p.dump(path)
+        with open(path) as file:
+            data = json.load(file)
+        self.assertEqual(set(data["phases"]), {"draw", "frame"})
+        self.assertEqual(len(data["hitches"]), 1)
+        self.assertGreater(data["hitches"][0]["ms"], 999)
+
+
+if __name__ == '__main__':
+    unittest.main()
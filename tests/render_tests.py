@@ -0,0 +1,71 @@
+import pygame
+import card
+import constants as c
+import render
+import unittest
+
+
+def setup():
+    """ Make three cards side by side and a tracker that drew them """
+    cards = {}
+    for number, key in enumerate(("A", "B", "C")):
+        cards[key] = card.Card(0, number)
+        cards[key].set_x(number * 100)
+    tracker = render.DirtyTracker()
+    tracker.find_dirty(cards, list(cards))
+    return cards, tracker
+
+
+class TestRender(unittest.TestCase):
+    def test_first_frame(self):
+        """ Tests the whole screen is drawn first, then nothing """
+        cards, tracker = setup()
+        self.assertEqual(tracker.find_dirty(cards, list(cards)), [])
+        tracker.invalidate()
+        self.assertEqual(tracker.find_dirty(cards, list(cards)),
+                         [pygame.Rect(0, 0, c.SCREEN_WIDTH, c.SCREEN_HEIGHT)])
+
+    def test_moved(self):
+        """ Tests a moved card needs its old and new spot drawn """
+        cards, tracker = setup()
+        cards["B"].set_x(110)
+        self.assertEqual(
+            tracker.find_dirty(cards, list(cards)),
+            [pygame.Rect(100, 0, 10 + c.CARD_WIDTH, c.CARD_HEIGHT)])
+
+    def test_flipped(self):
+        """ Tests a flipped card needs its spot drawn """
+        cards, tracker = setup()
+        cards["C"].flip_visible()
+        self.assertEqual(tracker.find_dirty(cards, list(cards)),
+                         [pygame.Rect(200, 0, c.CARD_WIDTH, c.CARD_HEIGHT)])
+
+    def test_reordered(self):
+        """ Tests the cards from the first change in the order are drawn """
+        cards, tracker = setup()
+        self.assertEqual(tracker.find_dirty(cards, ["A", "C", "B"]),
+                         [pygame.Rect(200, 0, c.CARD_WIDTH, c.CARD_HEIGHT),
+                          pygame.Rect(100, 0, c.CARD_WIDTH, c.CARD_HEIGHT)])
+
+    def test_pending(self):
+        """ Tests a part marked with add is drawn once """
+        cards, tracker = setup()
+        tracker.add(pygame.Rect(5, 5, 10, 10))
+        self.assertEqual(tracker.find_dirty(cards, list(cards)),
+                         [pygame.Rect(5, 5, 10, 10)])
+        self.assertEqual(tracker.find_dirty(cards, list(cards)), [])
+
+    def test_merge_rects(self):
+        """ Tests overlapping rects are joined and the rest kept """
+        merged = render.merge_rects([
+            pygame.Rect(0, 0, 10, 10), pygame.Rect(50, 50, 10, 10),
+            pygame.Rect(5, 5, 10, 10), pygame.Rect(14, 14, 40, 40)])
+        self.assertEqual(merged, [pygame.Rect(0, 0, 60, 60)])
+        self.assertEqual(
+            render.merge_rects([pygame.Rect(0, 0, 10, 10),
+                                pygame.Rect(10, 0, 10, 10)]),
+            [pygame.Rect(0, 0, 10, 10), pygame.Rect(10, 0, 10, 10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
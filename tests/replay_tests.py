@@ -0,0 +1,45 @@
+import constants as c
+import deals
+import engine
+import random
+import replay
+import unittest
+
+
+class TestReplay(unittest.TestCase):
+    def test_pack_move(self):
+        """ Tests a packed move comes back the same in 2 bytes """
+        data = replay.pack_move(engine.PLACE, engine.TABLE0 + 6,
+                                engine.ACE0 + 3, 13)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(
+            replay.unpack_move(data, 0),
+            (engine.PLACE, engine.TABLE0 + 6, engine.ACE0 + 3, 13))
+
+    def test_replay(self):
+        """ Tests playing back a recording ends in the same state """
+        s = engine.GameState(c.UNDO_LIMIT)
+        s.deal(deals.deal_order(9))
+        recorder = replay.Recorder(9)
+        rng = random.Random(9)
+        for _ in range(200):
+            if rng.random() < 0.2 and s.undo_count != 0:
+                s.undo()
+                recorder.record_undo()
+            else:
+                move = rng.choice(s.legal_moves())
+                s.apply(move)
+                recorder.record(move)
+        data = recorder.data()
+        self.assertEqual(len(data), replay.HEADER_SIZE + 400)
+        self.assertEqual(replay.read(data)[0], 9)
+        self.assertEqual(replay.replay(data), s)
+
+    def test_not_a_recording(self):
+        """ Tests other data is refused """
+        with self.assertRaises(ValueError):
+            replay.read(b"PNG\x00" + bytes(20))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import engine
+import server
+import unittest
+
+
+class TestServer(unittest.TestCase):
+    def test_session(self):
+        """ Tests each request changes the game and gets the right reply """
+        session = server.Session()
+        self.assertEqual(session.handle("DEAL 7"), "OK 7")
+        start = session.handle("STATE")
+        self.assertEqual(start, "OK 7 " + session.state.pack().hex())
+        self.assertEqual(session.handle("UNDO"), "ERR nothing to undo")
+        self.assertEqual(session.handle("MOVE 0 0 1 1"), "OK")
+        self.assertEqual(session.handle("MOVE 2 0 4 1"), "ERR illegal move")
+        self.assertEqual(session.handle("UNDO"), "OK 0 1")
+        self.assertEqual(session.handle("STATE"), start)
+        self.assertEqual(session.handle("MOVE 0 x"), "ERR bad number")
+        self.assertEqual(session.handle("DEAL -1"), "ERR bad deal number")
+        self.assertEqual(session.handle("FLY"), "ERR unknown request")
+
+    def test_load(self):
+        """ Tests many clients play at once and their games match """
+        result = asyncio.run(server.load(20, 30))
+        self.assertEqual(result["requests"], 600)
+        self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+
+    def test_client(self):
+        """ Tests a client's copy of the game follows the server's """
+        async def check():
+            listener = await server.Server().start(server.HOST, 0)
+            client = await server.Client.connect(
+                *listener.sockets[0].getsockname()[:2])
+            await client.deal(3)
+            # Drawing a card is the first legal move
+            await client.move(client.state.legal_moves()[0])
+            reply = await client.request("STATE")
+            await client.close()
+            listener.close()
+            await listener.wait_closed()
+            return reply
+        reply = asyncio.run(check())
+        state = engine.GameState.unpack(bytes.fromhex(reply.split()[2]))
+        self.assertEqual(state.founded, 0)
+        self.assertEqual(len(state.piles[engine.DECK]), 23)
+
+    def test_bad_line(self):
+        """ Tests a line that is not text or too long closes the connection """
+        async def send(data):
+            listener = await server.Server().start(server.HOST, 0)
+            reader, writer = await asyncio.open_connection(
+                *listener.sockets[0].getsockname()[:2])
+            writer.write(data)
+            await writer.drain()
+            reply = await reader.read()
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+            return reply
+        self.assertEqual(asyncio.run(send(b"\xff\nSTATE\n")),
+                         b"ERR bad line\n")
+        self.assertEqual(
+            asyncio.run(send(b"DEAL " + b"1" * server.LINE_LIMIT + b"\n")),
+            b"ERR bad line\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import engine
+import solver
+import unittest
+
+
+def nearly_won():
+    """ Get a state with every card on a final pile but the four kings """
+    s = engine.GameState()
+    for suit in range(4):
+        for rank in range(12):
+            s.push(engine.ACE0 + suit, suit * 13 + rank)
+    for suit in range(4):
+        s.push(engine.TABLE0 + suit, suit * 13 + 12)
+    return s
+
+
+class TestSolver(unittest.TestCase):
+    def test_solve_nearly_won(self):
+        """ Tests the moves found win the game when made """
+        s = nearly_won()
+        s.piles[engine.TABLE0].insert(0, s.pop(engine.ACE0 + 1))
+        s.where[engine.IDS["DIAMONDSQ"]] = engine.TABLE0
+        s.take_out_play(engine.IDS["DIAMONDSQ"])
+        result = solver.solve(s)
+        self.assertTrue(result.winnable)
+        self.assertEqual(len(s.piles[engine.ACE0 + 1]), 11)
+        for move in result.moves:
+            self.assertIn(move, s.legal_moves())
+            s.apply(move)
+        self.assertTrue(s.is_won())
+
+    def test_solve_stuck(self):
+        """ Tests a game with no moves left can not be won """
+        s = engine.GameState()
+        s.push(engine.TABLE0, engine.IDS["HEARTSA"])
+        s.push(engine.TABLE0, engine.IDS["HEARTS2"])
+        s.take_out_play(engine.IDS["HEARTSA"])
+        result = solver.solve(s)
+        self.assertFalse(result.winnable)
+        self.assertEqual(result.moves, [])
+
+    def test_node_limit(self):
+        """ Tests running out of nodes leaves the answer unknown """
+        result = solver.solve_deal(range(52), max_nodes=1)
+        self.assertIsNone(result.winnable)
+        self.assertEqual(result.nodes, 1)
+
+    def test_table_limit(self):
+        """ Tests the table throws away the oldest positions when full """
+        table = solver.TranspositionTable(4)
+        for key in range(5):
+            table.add(key)
+        self.assertLessEqual(len(table), 4)
+        self.assertNotIn(0, table)
+        self.assertIn(4, table)
+
+
+if __name__ == '__main__':
+    unittest.main()
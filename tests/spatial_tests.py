@@ -0,0 +1,58 @@
+import constants as c
+import spatial
+import unittest
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def test_place(self):
+        """ Tests a placed box is found at the points it touches """
+        index = spatial.SpatialIndex(10, 10)
+        index.place("a", 12, 12, 5, 5)
+        self.assertEqual(index.at(15, 15), ["a"])
+        self.assertEqual(index.at(5, 5), [])
+
+    def test_move(self):
+        """ Tests a moved box leaves the cells it no longer touches """
+        index = spatial.SpatialIndex(10, 10)
+        index.place("a", 12, 12, 5, 5)
+        index.place("a", 42, 12, 5, 5)
+        self.assertEqual(index.at(15, 15), [])
+        self.assertEqual(index.at(45, 15), ["a"])
+        self.assertEqual(index.boxes["a"], (42, 12, 5, 5))
+
+    def test_remove(self):
+        """ Tests a removed box is no longer found """
+        index = spatial.SpatialIndex(10, 10)
+        index.place("a", 12, 12, 5, 5)
+        index.remove("a")
+        self.assertEqual(index.at(15, 15), [])
+        self.assertNotIn("a", index.boxes)
+        # Removing a key that is not there does nothing
+        index.remove("a")
+
+    def test_order(self):
+        """ Tests keys come lowest first, a raised key last """
+        index = spatial.SpatialIndex(10, 10)
+        for key in "abc":
+            index.place(key, 12, 12, 5, 5)
+        self.assertEqual(index.at(15, 15), ["a", "b", "c"])
+        index.raise_key("a")
+        self.assertEqual(index.at(15, 15), ["b", "c", "a"])
+        # Moving a key keeps its place in the order
+        index.place("b", 13, 13, 5, 5)
+        self.assertEqual(index.at(15, 15), ["b", "c", "a"])
+
+    def test_edges(self):
+        """ Tests boxes past the screen edges are kept to the screen """
+        index = spatial.SpatialIndex()
+        index.place("a", -30, -30, 42, 60)
+        index.place("b", c.SCREEN_WIDTH - 10, c.SCREEN_HEIGHT - 10, 42, 60)
+        self.assertEqual(index.at(0, 0), ["a"])
+        self.assertEqual(
+            index.at(c.SCREEN_WIDTH - 1, c.SCREEN_HEIGHT - 1), ["b"])
+        self.assertEqual(index.at(-1, 5), [])
+        self.assertEqual(index.at(5, c.SCREEN_HEIGHT * 2), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import pygame
+import constants as c
+import sprites
+import unittest
+
+# Colour of the sheet left see-through
+KEY = (0, 0, 0)
+
+
+def make_sheet():
+    """ Make a sprite sheet with a different colour in every sprite """
+    sheet = pygame.Surface((c.CARD_BACK_X + c.CARD_WIDTH, 4 * c.CARD_HEIGHT))
+    sheet.fill(KEY)
+    for i in range(4):
+        for j in range(13):
+            # Leave a see-through corner in each face
+            sheet.fill((i * 60 + 10, j * 19 + 10, 200), pygame.Rect(
+                j * c.CARD_WIDTH + 2, i * c.CARD_HEIGHT + 2,
+                c.CARD_WIDTH - 2, c.CARD_HEIGHT - 2))
+    sheet.fill((250, 0, 0), pygame.Rect(
+        c.CARD_BACK_X, c.CARD_BACK_Y + 2, c.CARD_WIDTH, c.CARD_HEIGHT - 2))
+    sheet.set_colorkey(KEY)
+    return sheet
+
+
+def pixels(surface):
+    """ Get the RGB bytes of a surface, whatever its pixel format """
+    return pygame.image.tobytes(surface, "RGB")
+
+
+class TestSprites(unittest.TestCase):
+    def check(self, sheet, images):
+        """ Check each sprite matches its part of the sheet """
+        for i in range(4):
+            for j in range(13):
+                self.assertEqual(
+                    pixels(images.faces[i * 13 + j]),
+                    pixels(sheet.subsurface(pygame.Rect(
+                        j * c.CARD_WIDTH, i * c.CARD_HEIGHT,
+                        c.CARD_WIDTH, c.CARD_HEIGHT))))
+        self.assertEqual(pixels(images.back), pixels(sheet.subsurface(
+            pygame.Rect(c.CARD_BACK_X, c.CARD_BACK_Y,
+                        c.CARD_WIDTH, c.CARD_HEIGHT))))
+
+    def test_without_display(self):
+        """ Tests the sprites are cut out with no display """
+        pygame.display.quit()
+        sheet = make_sheet()
+        images = sprites.CardSprites(sheet)
+        self.check(sheet, images)
+        self.assertEqual(images.back.get_colorkey()[:3], KEY)
+
+    def test_converted(self):
+        """ Tests converting to the display keeps the pixels and colorkey """
+        pygame.display.init()
+        screen = pygame.display.set_mode((c.SCREEN_WIDTH, c.SCREEN_HEIGHT))
+        sheet = make_sheet()
+        images = sprites.CardSprites(sheet)
+        self.check(sheet, images)
+        for image in images.faces + [images.back]:
+            self.assertEqual(image.get_bitsize(), screen.get_bitsize())
+            self.assertEqual(image.get_colorkey()[:3], KEY)
+        # The see-through corner shows what is under it
+        screen.fill((1, 2, 3))
+        screen.blit(images.faces[0], (0, 0))
+        self.assertEqual(screen.get_at((0, 0))[:3], (1, 2, 3))
+        self.assertNotEqual(screen.get_at((5, 5))[:3], (1, 2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import constants as c
+import deals
+import engine
+import os
+import pygame
+import tempfile
+import thumbnails
+import unittest
+
+
+def rgb(surface):
+    """ Get the colours of the pixels of surface """
+    return pygame.image.tobytes(surface.copy(), "RGB")
+
+
+class TestBoardRenderer(unittest.TestCase):
+    def test_draw(self):
+        """ Tests face up and face down cards are drawn where they sit """
+        renderer = thumbnails.BoardRenderer()
+        s = engine.GameState()
+        s.deal(deals.deal_order(1))
+        surface = renderer.draw(s)
+        top = s.piles[engine.TABLE0 + 1][-1]
+        x, y = c.PILE_SPOTS["TABLE1"]
+        # Only the middle of each card, the corners are see-through
+        self.assertEqual(rgb(surface.subsurface((x + 5, y + 20, 30, 40))),
+                         rgb(renderer.images.faces[top].subsurface(
+                             (5, 5, 30, 40))))
+        self.assertEqual(rgb(surface.subsurface((x + 5, y + 5, 30, 10))),
+                         rgb(renderer.images.back.subsurface(
+                             (5, 5, 30, 10))))
+
+    def test_render_batch(self):
+        """ Tests a batch of deals is drawn to scaled pngs """
+        folder = tempfile.mkdtemp()
+        jobs = thumbnails.deal_jobs(5, 3, folder, 160)
+        self.assertEqual(thumbnails.render_batch(jobs, 2), 3)
+        image = pygame.image.load(os.path.join(folder, "deal_6.png"))
+        self.assertEqual(image.get_size(), (160, 120))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import zorder
+import unittest
+
+
+class TestZOrder(unittest.TestCase):
+    def test_raise(self):
+        """ Tests raising a key puts it on top and keeps the others """
+        order = zorder.ZOrder("abcd")
+        order.raise_key("b")
+        self.assertEqual(list(order), ["a", "c", "d", "b"])
+        self.assertEqual(list(reversed(order)), ["b", "d", "c", "a"])
+        self.assertEqual(order.top(), "b")
+        self.assertGreater(order.stamp("b"), order.stamp("d"))
+        order.raise_key("e")
+        self.assertEqual(order.top(), "e")
+        self.assertEqual(len(order), 5)
+
+    def test_remove(self):
+        """ Tests a removed key is no longer drawn """
+        order = zorder.ZOrder("abc")
+        order.remove("b")
+        self.assertNotIn("b", order)
+        self.assertEqual(list(order), ["a", "c"])
+
+    def test_equal(self):
+        """ Tests orders are equal when their keys are in the same order """
+        order = zorder.ZOrder("abc")
+        other = zorder.ZOrder("cab")
+        self.assertNotEqual(order, other)
+        other.raise_key("a")
+        other.raise_key("b")
+        self.assertNotEqual(order, other)
+        other.raise_key("c")
+        self.assertEqual(order, other)
+
+
+if __name__ == '__main__':
+    unittest.main()